@@ -2,14 +2,11 @@ from __future__ import annotations
 
 import time
 from dataclasses import dataclass, field
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, Iterable, List, Optional, Tuple
 import os
 
-import matplotlib
-
-matplotlib.use("Agg", force=True)
-import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
 
@@ -517,7 +514,19 @@ def analyze(config: AnalysisConfig) -> AnalysisResult:
     )
 
 
+@lru_cache(maxsize=1)
+def _pyplot():
+    """按需加载 matplotlib（无界面后端）；仅生成图表时才需要，避免拖慢 CLI 启动"""
+    import matplotlib
+
+    matplotlib.use("Agg", force=True)
+    import matplotlib.pyplot as plt
+
+    return plt
+
+
 def _make_plots(output_dir: Path, momentum_df: pd.DataFrame, rank_df: pd.DataFrame, trend_values: Dict[str, pd.Series]) -> List[Path]:
+    plt = _pyplot()
     paths: List[Path] = []
     plt.style.use("seaborn-v0_8")
 
@@ -25,6 +25,7 @@ from .templates import (
     build_builtin_template,
     get_builtin_template_store,
     load_template_store,
+    load_template_store_readonly,
     write_template_store,
     get_template,
     save_template,
@@ -48,17 +49,32 @@ from .alerts import (
     detect_rank_drop_alerts,
     collect_alerts,
 )
-from .config import (
-    configure_correlation_threshold_interactive,
-    configure_plot_style_interactive,
-    configure_cli_theme_interactive,
-    configure_signal_thresholds_interactive,
-    configure_stability_settings_interactive,
-)
 from .bundle import (
     update_data_bundle_interactive,
 )
 
+# 交互式配置函数只在设置菜单中使用，按需导入以缩短 CLI 启动时间（PEP 562）
+_LAZY_CONFIG_NAMES = frozenset(
+    {
+        "configure_correlation_threshold_interactive",
+        "configure_plot_style_interactive",
+        "configure_cli_theme_interactive",
+        "configure_signal_thresholds_interactive",
+        "configure_stability_settings_interactive",
+    }
+)
+
+
+def __getattr__(name: str):
+    if name in _LAZY_CONFIG_NAMES:
+        from . import config as _config
+
+        value = getattr(_config, name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 __all__ = [
     # Analysis
     "build_configs_from_params",
@@ -79,6 +95,7 @@ __all__ = [
     "build_builtin_template",
     "get_builtin_template_store",
     "load_template_store",
+    "load_template_store_readonly",
     "write_template_store",
     "get_template",
     "save_template",
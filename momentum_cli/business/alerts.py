@@ -44,12 +44,17 @@ def detect_high_correlation_pairs(
     cols = cols[mask]
     values = values[mask]
     
-    # 按相关性降序排序
-    order = np.argsort(values)[::-1]
+    # 按相关性降序排序；超出 max_pairs 时先用 argpartition 取出前 k 个再排序
+    count = values.size
+    if 0 < max_pairs < count:
+        top = np.argpartition(values, count - max_pairs)[count - max_pairs:]
+        order = top[np.argsort(values[top], kind="stable")[::-1]]
+    else:
+        order = np.argsort(values, kind="stable")[::-1][:max_pairs]
     columns = list(corr.columns)
     
     alerts: List[dict] = []
-    for idx in order[:max_pairs]:
+    for idx in order:
         i = rows[idx]
         j = cols[idx]
         value = float(values[idx])
@@ -107,44 +112,40 @@ def detect_rank_drop_alerts(
     if not codes:
         return alerts
     
-    # 按周重采样
-    weekly = rank_history.sort_index().resample("W-FRI").last().ffill()
-    
-    for code in codes:
-        if code not in weekly.columns:
-            continue
-        series = weekly[code].dropna()
-        if len(series) < weeks + 1:
-            continue
-        
-        # 检查最近 weeks 周是否连续下降（排名变大）
-        recent_diff = series.diff().iloc[-weeks:]
-        if recent_diff.isna().any():
-            continue
-        if not (recent_diff > 0).all():
-            continue
-        
-        start_rank = float(series.iloc[-(weeks + 1)])
-        end_rank = float(series.iloc[-1])
-        total_drop = end_rank - start_rank
-        
-        if total_drop < min_drop:
-            continue
-        
+    # 只对需要检测的列按周重采样；重采样与前向填充均逐列独立，结果与整表处理一致
+    present = [code for code in codes if code in rank_history.columns]
+    if not present:
+        return alerts
+    weekly = rank_history[present].sort_index().resample("W-FRI").last().ffill()
+    if len(weekly) < weeks + 1:
+        return alerts
+
+    # 前向填充后缺失值只会出现在序列开头，因此“有效长度 ≥ weeks+1”
+    # 等价于最后 weeks+1 周全部非空；连续下降（排名变大）与幅度判断一次完成
+    tail = weekly.to_numpy(dtype=float)[-(weeks + 1):]
+    complete = ~np.isnan(tail).any(axis=0)
+    rising = (np.diff(tail, axis=0) > 0).all(axis=0)
+    total_drops = tail[-1] - tail[0]
+    hits = complete & rising & (total_drops >= min_drop)
+
+    for pos in np.flatnonzero(hits):
+        code = present[pos]
+        start_rank = float(tail[0, pos])
+        end_rank = float(tail[-1, pos])
         alert = {
             "code": code,
             "start_rank": int(round(start_rank)),
             "end_rank": int(round(end_rank)),
             "weeks": weeks,
-            "drop": round(total_drop, 2),
+            "drop": round(end_rank - start_rank, 2),
         }
-        
+
         # 如果提供了格式化函数，添加标签
         if format_label_func:
             alert["label"] = format_label_func(code)
-        
+
         alerts.append(alert)
-    
+
     return alerts
     
     summary = result.summary
@@ -1,9 +1,21 @@
 """回测业务逻辑模块"""
 from __future__ import annotations
 
-from typing import List
+from functools import lru_cache
+from typing import Callable, Dict, List, Sequence
 import numpy as np
 import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+try:
+    import bottleneck as _bn
+except ImportError:  # pragma: no cover - 可选依赖
+    _bn = None
+
+try:
+    from numba import njit as _njit
+except ImportError:  # pragma: no cover - 可选依赖
+    _njit = None
 
 from ..analysis_presets import AnalysisPreset
 from ..utils.colors import colorize
@@ -11,6 +23,38 @@ from ..utils.helpers import format_code_label as _format_label
 from ..metadata import get_label as _get_label
 
 
+_NAN_DASH = "-"
+
+
+def _fmt_pct(x: float, digits: int = 2) -> str:
+    return _NAN_DASH if np.isnan(x) else f"{x:.{digits}%}"
+
+
+def _fmt_num(x: float) -> str:
+    return _NAN_DASH if np.isnan(x) else f"{x:.2f}"
+
+
+# 表格配色规则：(指标键, 行内样式键, 零值是否计为正, 正值样式, 负值样式)
+_METRIC_STYLE_RULES: tuple[tuple[str, tuple[str, ...], bool, str, str], ...] = (
+    ("total_return", ("style_total", "style_annual"), True, "value_positive", "value_negative"),
+    ("max_drawdown", ("style_maxdd",), True, "value_positive", "value_negative"),
+    ("sharpe", ("style_sharpe",), False, "accent", "warning"),
+)
+
+
+def _apply_metric_styles(row: dict, metrics: Dict[str, float]) -> dict:
+    """按 _METRIC_STYLE_RULES 写入表格行的配色键；指标为 NaN 时不设样式"""
+    for key, style_keys, zero_is_positive, positive_style, negative_style in _METRIC_STYLE_RULES:
+        value = metrics[key]
+        if np.isnan(value):
+            continue
+        positive = value >= 0 if zero_is_positive else value > 0
+        style = positive_style if positive else negative_style
+        for style_key in style_keys:
+            row[style_key] = style
+    return row
+
+
 def select_assets_with_constraints(
     momentum_scores: pd.Series,
     momentum_percentiles: pd.Series,
@@ -32,51 +76,99 @@ def select_assets_with_constraints(
     Returns:
         (selected_codes, diagnostics)
     """
-    diagnostics = {
+    if momentum_percentiles is None:
+        return [], _empty_selection_diagnostics()
+    return _select_assets_from_arrays(
+        momentum_percentiles.index.tolist(),
+        momentum_percentiles.to_numpy(dtype=float),
+        correlation_matrix,
+        top_n,
+        min_percentile=min_percentile,
+        max_correlation=max_correlation,
+    )
+
+
+def _empty_selection_diagnostics() -> dict:
+    return {
         "candidates_count": 0,
         "selected_count": 0,
         "correlation_violations": 0,
         "shrunk": False,
     }
 
+
+def _descending_order(values: np.ndarray) -> np.ndarray:
+    """与 ``Series.sort_values(ascending=False)`` 相同的降序下标（并列项顺序也一致）
+
+    pandas 降序时先反转、按默认 quicksort 升序排序再反转回来，这里照搬同一做法，
+    以免并列分位数在 TopN 边界处选出与原实现不同的标的。
+    """
+    n = len(values)
+    reversed_pos = np.arange(n - 1, -1, -1)
+    return reversed_pos[np.argsort(values[::-1], kind="quicksort")][::-1]
+
+
+def _select_assets_from_arrays(
+    codes: Sequence[str],
+    percentiles: np.ndarray,
+    correlation_matrix: pd.DataFrame | None,
+    top_n: int,
+    *,
+    min_percentile: float = 0.6,
+    max_correlation: float = 0.85,
+) -> tuple[list[str], dict]:
+    """``select_assets_with_constraints`` 的数组版本：分位数按 ``codes`` 顺序以 ndarray 传入"""
+    diagnostics = _empty_selection_diagnostics()
+
     # 1. 过滤动量分位数（允许传入 0-1 或 0-100 两种尺度）
-    if momentum_percentiles is None or momentum_percentiles.empty:
+    if len(percentiles) == 0:
         return [], diagnostics
 
     threshold = float(min_percentile)
     if threshold > 1.0:
         threshold = threshold / 100.0
 
-    candidates = momentum_percentiles[momentum_percentiles >= threshold]
-    diagnostics["candidates_count"] = len(candidates)
+    eligible = np.flatnonzero(percentiles >= threshold)
+    diagnostics["candidates_count"] = len(eligible)
 
-    if len(candidates) == 0:
+    if len(eligible) == 0:
         # 无合格候选，返回空
         return [], diagnostics
 
-    # 2. 按动量得分排序
-    candidates_sorted = candidates.sort_values(ascending=False)
+    # 2. 按动量分位数降序排列候选
+    candidates_sorted = eligible[_descending_order(percentiles[eligible])]
 
-    # 3. 贪心选择：逐个添加，检查相关性
+    if correlation_matrix is None:
+        # 无相关性约束时贪心过程不会跳过任何候选，按稳定排序直接取前 TopN（并列时保持原顺序）
+        selected = [codes[i] for i in candidates_sorted[:top_n]]
+        diagnostics["selected_count"] = len(selected)
+        diagnostics["shrunk"] = len(selected) < top_n
+        return selected, diagnostics
+
+    # 3. 预计算候选两两之间的可共存矩阵：缺失/NaN 相关性视为可共存
+    cand_codes = [codes[i] for i in candidates_sorted]
+    row_pos = correlation_matrix.index.get_indexer(cand_codes)
+    col_pos = correlation_matrix.columns.get_indexer(cand_codes)
+    corr_arr = correlation_matrix.to_numpy(dtype=float)
+    row_ok = row_pos >= 0
+    col_ok = col_pos >= 0
+    admissible = np.ones((len(cand_codes), len(cand_codes)), dtype=bool)
+    if row_ok.any() and col_ok.any():
+        sub = np.abs(corr_arr[np.ix_(row_pos[row_ok], col_pos[col_ok])])
+        admissible[np.ix_(row_ok, col_ok)] = ~(sub > max_correlation)
+    np.fill_diagonal(admissible, True)
+
+    # 4. 贪心选择：逐个添加，与已选资产任一相关性过高即跳过
     selected = []
-    for code in candidates_sorted.index:
+    selected_idx: list[int] = []
+    for k, code in enumerate(cand_codes):
         if len(selected) >= top_n:
             break
-
-        # 检查与已选资产的相关性
-        if len(selected) > 0 and correlation_matrix is not None:
-            correlations = []
-            for s in selected:
-                if code in correlation_matrix.index and s in correlation_matrix.columns:
-                    corr = correlation_matrix.loc[code, s]
-                    if pd.notna(corr):
-                        correlations.append(abs(corr))
-
-            if correlations and max(correlations) > max_correlation:
-                diagnostics["correlation_violations"] += 1
-                continue  # 相关性过高，跳过
-
+        if selected_idx and not admissible[k, selected_idx].all():
+            diagnostics["correlation_violations"] += 1
+            continue  # 相关性过高，跳过
         selected.append(code)
+        selected_idx.append(k)
 
     diagnostics["selected_count"] = len(selected)
     if len(selected) < top_n:
@@ -85,6 +177,122 @@ def select_assets_with_constraints(
     return selected, diagnostics
 
 
+def _memo_label(format_label_func: Callable[[str], str]) -> Callable[[str], str]:
+    """代码 -> 显示名称在单次回测内不变，缓存避免持仓/止损输出重复拼装标签"""
+    return lru_cache(maxsize=4096)(format_label_func)
+
+
+def _same_frames(cached_key: tuple, cache_key: tuple) -> bool:
+    """逐项比较 (代码, 行情帧)：代码相等且帧为同一对象"""
+    if len(cached_key) != len(cache_key):
+        return False
+    return all(
+        cached_code == code and cached_frame is frame
+        for (cached_code, cached_frame), (code, frame) in zip(cached_key, cache_key)
+    )
+
+
+def _materialize_close_df(result) -> pd.DataFrame:
+    """将 ``result.raw_data`` 的收盘价汇总为 DataFrame，并缓存在 result 上
+
+    同一分析结果多次回测时只构建一次；缓存按各标的行情帧的身份校验，
+    ``raw_data`` 原地增删、替换任一标的的帧时都会重建。
+    返回的 DataFrame 为共享对象，调用方不得原地修改。
+    """
+    raw_data = result.raw_data
+    # 缓存中保留帧本身的引用，旧帧不会被回收，其 id 也就不会被新对象复用
+    cache_key = tuple(raw_data.items())
+    cached = getattr(result, "_cached_close_df", None)
+    if cached is not None and _same_frames(cached[0], cache_key):
+        return cached[1]
+    codes = list(raw_data)
+    series_list = [raw_data[code]["close"] for code in codes]
+    if not series_list:
+        close_df = pd.DataFrame()
+    else:
+        first_index = series_list[0].index
+        if all(s.index is first_index or s.index.equals(first_index) for s in series_list[1:]):
+            # 数据包内标的通常共用同一日期索引：直接按列拼接，免去逐列对齐
+            close_df = pd.DataFrame(
+                np.column_stack([s.to_numpy(dtype=np.float64) for s in series_list]),
+                index=first_index,
+                columns=codes,
+            )
+        else:
+            close_df = pd.concat(series_list, axis=1, keys=codes)
+        if not close_df.index.is_monotonic_increasing:
+            close_df = close_df.sort_index()
+    close_df = close_df.dropna(how="all")
+    try:
+        result._cached_close_df = (cache_key, close_df)
+    except AttributeError:
+        pass
+    return close_df
+
+
+def _daily_returns(close_arr: np.ndarray) -> np.ndarray:
+    """逐日简单收益矩阵，等价于 ``pct_change().fillna(0)`` 但只分配一次
+
+    首行、缺失价格及除零产生的非有限值一律记为 0。
+    """
+    returns_arr = np.empty_like(close_arr, dtype=np.float64)
+    if len(returns_arr):
+        returns_arr[0] = 0.0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        np.divide(close_arr[1:] - close_arr[:-1], close_arr[:-1], out=returns_arr[1:])
+    np.nan_to_num(returns_arr, copy=False, nan=0.0, posinf=0.0, neginf=0.0)
+    return returns_arr
+
+
+def _rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+    """``min_periods=1`` 的滚动均值（忽略缺失值）；安装 bottleneck 时走其 C 实现"""
+    values = np.asarray(values, dtype=np.float64)
+    if len(values) == 0:
+        return values.copy()
+    # 窗口超过序列长度时与整段扩展均值等价
+    window = max(1, min(int(window), len(values)))
+    if _bn is not None:
+        return _bn.move_mean(values, window=window, min_count=1)
+    # 前补 window-1 个空位后按固定窗口求和/计数，缺失值不计入
+    missing = np.isnan(values)
+    pad = np.zeros(window - 1)
+    sums = sliding_window_view(np.concatenate([pad, np.where(missing, 0.0, values)]), window).sum(axis=-1)
+    counts = sliding_window_view(np.concatenate([pad, (~missing).astype(np.float64)]), window).sum(axis=-1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(counts > 0, sums / counts, np.nan)
+
+
+def _lagged_weights(
+    target_rows: dict[pd.Timestamp, dict[str, float]],
+    index: pd.Index,
+    columns: Sequence[str],
+) -> np.ndarray:
+    """由调仓日目标权重直接构造滞后一日的 (T, N) 持仓矩阵
+
+    目标在调仓日收盘生效，因此第 t 日收益使用 t-1 日收盘后的持仓；
+    首次调仓前视为空仓。相当于 ``weights.shift().ffill().fillna(0)``，但只分配一次。
+    """
+    lagged = np.zeros((len(index), len(columns)), dtype=np.float64)
+    if target_rows:
+        dates = list(target_rows)
+        rows = (
+            pd.DataFrame.from_dict(target_rows, orient="index", dtype=float)
+            .reindex(index=dates, columns=columns)
+            .fillna(0.0)
+            .to_numpy()
+        )
+        effective = index.get_indexer(dates) + 1
+        segment = np.searchsorted(effective, np.arange(len(index)), side="right") - 1
+        held = segment >= 0
+        lagged[held] = rows[segment[held]]
+    return lagged
+
+
+def _portfolio_returns(weights_arr: np.ndarray, returns_arr: np.ndarray) -> np.ndarray:
+    """逐日组合收益 Σ w[t, n]·r[t, n]；einsum 融合乘加，不生成 (T, N) 临时矩阵"""
+    return np.einsum("tn,tn->t", weights_arr, returns_arr)
+
+
 def run_simple_backtest(
     result,
     preset: AnalysisPreset,
@@ -99,13 +307,16 @@ def run_simple_backtest(
     use_correlation_filter: bool = True,  # 是否使用相关性过滤
 ) -> None:
     """基于动量排名的可配置简易回测（等权持仓，含可选观察期与交易成本）"""
-    close_df = pd.DataFrame({code: data["close"] for code, data in result.raw_data.items()})
-    close_df = close_df.sort_index().dropna(how="all")
+    close_df = _materialize_close_df(result)
     if close_df.empty:
         print(colorize("无法回测：价格数据为空。", "warning"))
         return
 
-    returns_df = close_df.pct_change().fillna(0)
+    returns_df = pd.DataFrame(
+        _daily_returns(close_df.to_numpy(dtype=np.float64)),
+        index=close_df.index,
+        columns=close_df.columns,
+    )
 
     # 对齐动量得分：只回测有有效动量得分的期间
     momentum_df = result.momentum_scores
@@ -126,11 +337,11 @@ def run_simple_backtest(
     returns_df = returns_df.loc[common_dates]
     momentum_df = momentum_df.loc[common_dates]
 
-    # 获取动量分位数和相关性矩阵
-    percentiles_df = None
+    # 获取动量分位数（代码 -> 分位数，仅构建一次）和相关性矩阵
+    pct_map: dict[str, float] | None = None
     if hasattr(result, 'summary') and result.summary is not None and not result.summary.empty:
         if 'momentum_percentile' in result.summary.columns:
-            percentiles_df = result.summary.set_index('etf')['momentum_percentile']
+            pct_map = dict(zip(result.summary['etf'], result.summary['momentum_percentile']))
 
     # 相关性矩阵：兼容属性名 'correlation' 与 'correlation_matrix'
     correlation_matrix = getattr(result, 'correlation_matrix', None)
@@ -147,30 +358,30 @@ def run_simple_backtest(
     if rebalance_dates.empty:
         rebalance_dates = close_df.index
 
-    weights = pd.DataFrame(0.0, index=close_df.index, columns=close_df.columns)
     current_codes: List[str] = []
     # 观察期计数：code -> 连续未入选的周期数
     observation_counter: dict[str, int] = {}
 
+    # 调仓日目标权重（稀疏字典，仅记录持仓腿），回测结束后再一次性展开为稠密矩阵
+    target_rows: dict[pd.Timestamp, dict[str, float]] = {}
+    turnover_rows: dict[pd.Timestamp, float] = {}
     # 为计算换仓成本，记录上一期权重
-    last_weights = pd.Series(0.0, index=close_df.columns)
-    turnover_cost = pd.Series(0.0, index=close_df.index, dtype=float)
+    last_weights: dict[str, float] = {}
+    cost_rate = commission_rate + slippage_rate
 
     for date in close_df.index:
         if date in rebalance_dates:
             # 使用新的选仓器
             scores = momentum_df.loc[date].dropna()
 
-            # 获取当期分位数
-            current_percentiles = None
-            if percentiles_df is not None:
+            if use_correlation_filter and pct_map is not None:
+                # 获取当期分位数
                 # 简化：使用最新的分位数（实际应该按日期对齐）
-                current_percentiles = percentiles_df.reindex(scores.index)
-
-            if use_correlation_filter and current_percentiles is not None:
+                score_codes = scores.index.tolist()
+                current_percentiles = np.array([pct_map.get(c, np.nan) for c in score_codes], dtype=float)
                 # 使用约束选仓器
-                top_codes, diag = select_assets_with_constraints(
-                    scores,
+                top_codes, diag = _select_assets_from_arrays(
+                    score_codes,
                     current_percentiles,
                     correlation_matrix,
                     top_n,
@@ -215,24 +426,26 @@ def run_simple_backtest(
             current_codes = [c for c in next_hold if c in close_df.columns]
 
             # 根据新持仓设置等权目标
-            if current_codes:
-                target = pd.Series(0.0, index=close_df.columns)
-                target.loc[current_codes] = 1.0 / len(current_codes)
-            else:
-                target = pd.Series(0.0, index=close_df.columns)
+            target = {code: 1.0 / len(current_codes) for code in current_codes}
 
             # 计算换手成本（近似）：∑|Δw|*(佣金+滑点)
-            delta = (target - last_weights).abs()
-            cost_rate = commission_rate + slippage_rate
-            turnover_cost.loc[date] = float(delta.sum() * cost_rate)
+            delta_sum = sum(
+                abs(target.get(code, 0.0) - last_weights.get(code, 0.0))
+                for code in set(target) | set(last_weights)
+            )
+            turnover_rows[date] = float(delta_sum * cost_rate)
+            target_rows[date] = target
             last_weights = target
 
-        # 非调仓日沿用上一目标
-        if last_weights is not None:
-            weights.loc[date, :] = last_weights
+    # 非调仓日沿用上一目标；首次调仓前空仓
+    shifted_weights = _lagged_weights(target_rows, close_df.index, close_df.columns)
+    turnover_cost = pd.Series(turnover_rows, dtype=float).reindex(close_df.index, fill_value=0.0)
 
     # 组合收益，调仓日扣除换手成本
-    portfolio_returns = (weights.shift().fillna(0) * returns_df).sum(axis=1)
+    portfolio_returns = pd.Series(
+        _portfolio_returns(shifted_weights, returns_df.to_numpy()),
+        index=close_df.index,
+    )
     # 扣除成本（视为当天一次性扣减）
     portfolio_returns = portfolio_returns - turnover_cost
 
@@ -279,10 +492,9 @@ def run_simple_backtest(
     print(colorize(f"最大回撤: {max_drawdown:.2%}", "danger"))
 
     if len(current_codes) > 0:
-        last_w = weights.iloc[-1]
         holding_lines: List[str] = []
         for code in current_codes:
-            weight = float(last_w.get(code, 0.0))
+            weight = float(last_weights.get(code, 0.0))
             label = _format_label(code, _get_label)
             holding_lines.append(f"{label}: {weight:.1%}")
         print(colorize("最新持仓结构:", "heading"))
@@ -301,12 +513,12 @@ def run_core_satellite_multi_backtest(
     last_state: dict | None = None,
 ) -> None:
     """Run core-satellite multi-horizon backtest (core equal-weight + satellite TopN) via injected callbacks."""
+    label_of = _memo_label(format_label_func)
     context = obtain_context_func(last_state, allow_reuse=bool(last_state))
     if not context:
         return
     result = context["result"]
-    close_df = pd.DataFrame({code: data["close"] for code, data in result.raw_data.items()})
-    close_df = close_df.sort_index().dropna(how="all")
+    close_df = _materialize_close_df(result)
     if close_df.empty:
         print(colorize_func("无法回测：价格数据为空。", "warning"))
         return
@@ -347,8 +559,9 @@ def run_core_satellite_multi_backtest(
 
     for label, offset in horizons:
         start_candidate = end_date - offset
-        mask = close_df.index >= start_candidate
-        close_slice = close_df.loc[mask]
+        # 索引已排序：二分定位起点后直接切片，无需整列布尔掩码
+        i0 = close_df.index.searchsorted(start_candidate)
+        close_slice = close_df.iloc[i0:]
         if close_slice.empty:
             continue
         actual_start = close_slice.index[0]
@@ -369,12 +582,6 @@ def run_core_satellite_multi_backtest(
         if metrics["days"] < 40:
             warnings.append(f"{label} 数据量仅 {metrics['days']} 个交易日，结果仅供参考。")
             note_text = "样本偏少"
-        def _fmt_pct(x: float, digits=2):
-            import numpy as _np
-            return "-" if _np.isnan(x) else f"{x:.{digits}%}"
-        def _fmt_num(x):
-            import numpy as _np
-            return "-" if _np.isnan(x) else f"{x:.2f}"
         row = {
             "label": label,
             "start": str(actual_start.date()),
@@ -387,18 +594,7 @@ def run_core_satellite_multi_backtest(
             "sharpe": _fmt_num(metrics["sharpe"]),
             "note": note_text,
         }
-        import numpy as _np
-        if not _np.isnan(metrics["total_return"]):
-            if metrics["total_return"] >= 0:
-                row["style_total"] = "value_positive"
-                row["style_annual"] = "value_positive"
-            else:
-                row["style_total"] = "value_negative"
-                row["style_annual"] = "value_negative"
-        if not _np.isnan(metrics["max_drawdown"]):
-            row["style_maxdd"] = "value_negative" if metrics["max_drawdown"] < 0 else "value_positive"
-        if not _np.isnan(metrics["sharpe"]):
-            row["style_sharpe"] = "accent" if metrics["sharpe"] > 0 else "warning"
+        _apply_metric_styles(row, metrics)
         rows_for_table.append(row)
         last_holdings = detail.get("last_weights", {})
 
@@ -406,8 +602,9 @@ def run_core_satellite_multi_backtest(
     try:
         prev_month_end = (end_date - pd.offsets.MonthBegin(1)) - pd.Timedelta(days=1)
         prev_month_start = (prev_month_end.replace(day=1))
-        mask_month = (close_df.index >= prev_month_start) & (close_df.index <= prev_month_end)
-        close_slice = close_df.loc[mask_month]
+        m0 = close_df.index.searchsorted(prev_month_start)
+        m1 = close_df.index.searchsorted(prev_month_end, side="right")
+        close_slice = close_df.iloc[m0:m1]
         if not close_slice.empty:
             momentum_slice = momentum_df.reindex(close_slice.index).ffill()
             portfolio_returns, detail = core_satellite_returns_func(
@@ -421,12 +618,6 @@ def run_core_satellite_multi_backtest(
             )
             metrics = calc_metrics_func(portfolio_returns)
             if metrics["days"] > 0:
-                def _fmt_pct(x: float, digits=2):
-                    import numpy as _np
-                    return "-" if _np.isnan(x) else f"{x:.{digits}%}"
-                def _fmt_num(x):
-                    import numpy as _np
-                    return "-" if _np.isnan(x) else f"{x:.2f}"
                 row = {
                     "label": "近1个月",
                     "start": str(close_slice.index.min().date()),
@@ -439,18 +630,7 @@ def run_core_satellite_multi_backtest(
                     "sharpe": _fmt_num(metrics["sharpe"]),
                     "note": "",
                 }
-                import numpy as _np
-                if not _np.isnan(metrics["total_return"]):
-                    if metrics["total_return"] >= 0:
-                        row["style_total"] = "value_positive"
-                        row["style_annual"] = "value_positive"
-                    else:
-                        row["style_total"] = "value_negative"
-                        row["style_annual"] = "value_negative"
-                if not _np.isnan(metrics["max_drawdown"]):
-                    row["style_maxdd"] = "value_negative" if metrics["max_drawdown"] < 0 else "value_positive"
-                if not _np.isnan(metrics["sharpe"]):
-                    row["style_sharpe"] = "accent" if metrics["sharpe"] > 0 else "warning"
+                _apply_metric_styles(row, metrics)
                 rows_for_table.append(row)
                 last_holdings = detail.get("last_weights", {})
     except Exception:
@@ -466,7 +646,7 @@ def run_core_satellite_multi_backtest(
         sorted_holdings = sorted(last_holdings.items(), key=lambda item: item[1], reverse=True)
         holding_lines = []
         for code, weight in sorted_holdings:
-            label = format_label_func(code)
+            label = label_of(code)
             holding_lines.append(f"{label}: {weight:.1%}")
         print(colorize_func("\n最新权重（所有区间共用）:", "heading"))
         print(colorize_func("; ".join(holding_lines), "menu_text"))
@@ -491,12 +671,12 @@ def core_satellite_portfolio_returns(
         return pd.Series(dtype=float), {}
 
     # 只对价格数据和动量数据的重叠期间进行回测
-    common_dates = close_df.index.intersection(momentum_df.index)
+    # 先对交集日期排序（C ≤ T），避免 .loc 之后再对整张 T×N 表 sort_index
+    common_dates = close_df.index.intersection(momentum_df.index).sort_values()
     if len(common_dates) < 20:
         return pd.Series(dtype=float), {}
 
-    close_df = close_df.loc[common_dates].sort_index()
-    returns_df = close_df.pct_change().fillna(0.0)
+    close_df = close_df.loc[common_dates]
     aligned_momentum = momentum_df.loc[common_dates]
 
     rebalance_dates = close_df.resample("ME").last().index
@@ -504,12 +684,12 @@ def core_satellite_portfolio_returns(
         rebalance_dates = close_df.index
 
     universe = list(close_df.columns)
-    weights = pd.DataFrame(0.0, index=close_df.index, columns=universe)
 
     core_set = [code for code in core_codes if code in universe]
     sat_set = [code for code in satellite_codes if code in universe]
     used_sat_codes: set[str] = set()
     current_weights: Dict[str, float] = {}
+    target_rows: Dict[pd.Timestamp, Dict[str, float]] = {}
 
     for date in close_df.index:
         if date in rebalance_dates:
@@ -539,12 +719,14 @@ def core_satellite_portfolio_returns(
             else:
                 new_weights = {}
             current_weights = new_weights
-        if current_weights:
-            for code, weight in current_weights.items():
-                weights.loc[date, code] = weight
+            target_rows[date] = new_weights
 
-    shifted_weights = weights.shift().ffill().fillna(0.0)
-    portfolio_returns = (shifted_weights * returns_df).sum(axis=1)
+    shifted_weights = _lagged_weights(target_rows, close_df.index, universe)
+    returns_arr = _daily_returns(close_df.to_numpy(dtype=np.float64))
+    portfolio_returns = pd.Series(
+        _portfolio_returns(shifted_weights, returns_arr),
+        index=close_df.index,
+    )
 
     detail: Dict[str, object] = {
         "core_set": core_set,
@@ -589,6 +771,53 @@ def calculate_performance_metrics(returns: pd.Series) -> Dict[str, float]:
     }
 
 
+def _suffix_performance_metrics(returns: pd.Series, starts: Sequence[int]) -> list[Dict[str, float]]:
+    """
+    一次性计算同一收益序列多个后缀区间 ``returns.iloc[i0:]`` 的绩效指标
+
+    口径与 calculate_performance_metrics 一致：总收益与回撤基于累计对数收益，
+    均值/波动率基于反向累加得到的后缀和（全零尾部的和严格为 0）。
+    """
+    values = returns.to_numpy(dtype=float)
+    if np.isnan(values).any() or (values <= -1.0).any():
+        return [calculate_performance_metrics(returns.iloc[int(i0):]) for i0 in starts]
+
+    n_total = len(values)
+    periods_per_year = 252
+    log_growth = np.log1p(values)
+    cum_log = np.cumsum(log_growth)
+    suffix_log = np.cumsum(log_growth[::-1])[::-1]
+    suffix_sum = np.cumsum(values[::-1])[::-1]
+    suffix_sq = np.cumsum((values * values)[::-1])[::-1]
+
+    results: list[Dict[str, float]] = []
+    for i0 in starts:
+        i0 = int(i0)
+        days = n_total - i0
+        if days <= 0:
+            results.append(calculate_performance_metrics(returns.iloc[:0]))
+            continue
+        total_return = float(np.expm1(suffix_log[i0]))
+        annualized = (1 + total_return) ** (periods_per_year / days) - 1
+        tail = cum_log[i0:]
+        max_drawdown = float(np.expm1((tail - np.maximum.accumulate(tail)).min()))
+        mean = suffix_sum[i0] / days
+        std = np.nan
+        if days > 1:
+            std = np.sqrt(max(suffix_sq[i0] - suffix_sum[i0] * mean, 0.0) / (days - 1))
+        volatility = std * np.sqrt(periods_per_year)
+        sharpe = (mean / std) * np.sqrt(periods_per_year) if std > 0 else np.nan
+        results.append({
+            "days": int(days),
+            "total_return": total_return,
+            "annualized": float(annualized) if np.isfinite(annualized) else float("nan"),
+            "volatility": float(volatility) if np.isfinite(volatility) else float("nan"),
+            "max_drawdown": max_drawdown if np.isfinite(max_drawdown) else float("nan"),
+            "sharpe": float(sharpe) if np.isfinite(sharpe) else float("nan"),
+        })
+    return results
+
+
 def run_core_satellite_custom_backtest(
     obtain_context_func,
     get_core_satellite_codes_func,
@@ -616,12 +845,13 @@ def run_core_satellite_custom_backtest(
     - 防守时卫星持仓：Top N = 1，合计 15%（默认未使用部分留作现金）
     - 核心仓：60% 等权持有核心券池全部标的
     """
+    label_of = _memo_label(format_label_func)
     context = obtain_context_func(last_state, allow_reuse=False)
     if not context:
         return
     result = context["result"]
     momentum_df = result.momentum_scores
-    close_df = pd.DataFrame({code: data["close"] for code, data in result.raw_data.items()}).sort_index().dropna(how="all")
+    close_df = _materialize_close_df(result)
     if close_df.empty or momentum_df.empty:
         print(colorize_func("无法回测：数据为空。", "warning"))
         return
@@ -632,7 +862,7 @@ def run_core_satellite_custom_backtest(
         print(colorize_func("重叠区间过短，无法回测。", "warning"))
         return
     close_df = close_df.loc[common_dates]
-    returns_df = close_df.pct_change().fillna(0.0)
+    returns_arr = _daily_returns(close_df.to_numpy(dtype=np.float64))
     momentum_df = momentum_df.loc[common_dates]
 
     rebalance_dates = close_df.resample("ME").last().index
@@ -651,7 +881,6 @@ def run_core_satellite_custom_backtest(
     # 市场代理：510300 优先
     market_code = "510300.XSHG" if "510300.XSHG" in close_df.columns else (core_set[0] if core_set else None)
     market_close = close_df[market_code] if market_code else None
-    ma200 = market_close.rolling(window=ma_window, min_periods=1).mean() if market_close is not None else None
 
     # CHOP 使用分析结果中已有的序列（若可用）
     chop_series = None
@@ -662,8 +891,29 @@ def run_core_satellite_custom_backtest(
     except Exception:
         chop_series = None
 
-    weights = pd.DataFrame(0.0, index=close_df.index, columns=close_df.columns)
+    # 循环外一次性转为 NumPy 数组，调仓日按整数位置取值，避免逐日 .loc 标签查找
+    market_arr = market_close.to_numpy(dtype=float) if market_close is not None else None
+    ma200_arr = _rolling_mean(market_arr, ma_window) if market_arr is not None else None
+    chop_arr = chop_series.to_numpy(dtype=float) if chop_series is not None else None
+    mom_arr = momentum_df.to_numpy(dtype=float)
+    # 市场状态整段向量化：价格或均线缺失视为不在年线上方；无 CHOP 时仅以年线判定趋势
+    if market_arr is not None and ma200_arr is not None:
+        with np.errstate(invalid="ignore"):
+            above_ma_all = (market_arr > ma200_arr) & ~np.isnan(market_arr) & ~np.isnan(ma200_arr)
+    else:
+        above_ma_all = np.zeros(len(close_df.index), dtype=bool)
+    if chop_arr is not None:
+        with np.errstate(invalid="ignore"):
+            in_trend_all = np.where(np.isnan(chop_arr), above_ma_all, chop_arr < float(chop_threshold))
+    else:
+        in_trend_all = above_ma_all
+    # 卫星列位置在首次分配卫星仓时才解析：纯核心模式不读取卫星动量，缺列也不报错
+    sat_col_idx: np.ndarray | None = None
+    sat_codes_arr = np.array(sat_set, dtype=object)
+    rebalance_pos = np.flatnonzero(close_df.index.isin(rebalance_dates))
+
     current_w: dict[str, float] = {}
+    target_rows: dict[pd.Timestamp, dict[str, float]] = {}
     def _get_core_map_clean_default() -> dict:
         # 默认核心底座：总计 60%
         return {
@@ -689,61 +939,54 @@ def run_core_satellite_custom_backtest(
                 if code in close_df.columns and w > 0:
                     target[code] = target.get(code, 0.0) + float(w)
 
-    def _alloc_satellite(target: dict[str, float], date, allocation: float, top_n: int) -> None:
+    def _alloc_satellite(target: dict[str, float], i: int, allocation: float, top_n: int) -> None:
+        nonlocal sat_col_idx
         if mode in {"core+sat", "sat", "satellite", "sat-only"}:
             if not sat_set or allocation <= 0:
                 return
-            scores = momentum_df.loc[date, sat_set].dropna()
-            if scores.empty:
+            if sat_col_idx is None:
+                sat_col_idx = np.array([momentum_df.columns.get_loc(c) for c in sat_set], dtype=int)
+            scores = mom_arr[i, sat_col_idx]
+            valid = ~np.isnan(scores)
+            if not valid.any():
                 return
-            picks = scores.sort_values(ascending=False).head(max(1, top_n)).index.tolist()
+            order = np.argsort(-scores[valid], kind="stable")[: max(1, top_n)]
+            picks = sat_codes_arr[valid][order].tolist()
             per = allocation / len(picks)
             for code in picks:
                 target[code] = target.get(code, 0.0) + per
         else:
             return
 
-    for date in close_df.index:
-        if date in rebalance_dates:
-            target: dict[str, float] = {}
-            # 市场状态
-            above_ma = False
-            in_trend = False
-            if market_close is not None and ma200 is not None:
-                if not pd.isna(market_close.loc[date]) and not pd.isna(ma200.loc[date]):
-                    above_ma = bool(market_close.loc[date] > ma200.loc[date])
-
-            if chop_series is not None and not pd.isna(chop_series.loc[date]):
-                in_trend = chop_series.loc[date] < float(chop_threshold)
-            else:
-                # 无 CHOP 时仅以年线判定趋势
-                in_trend = above_ma
-
-            # 配置卫星参数：纯卫星模式不启用动态防守/CHOP/MA200，始终使用趋势期设置
-            if mode in {"sat", "sat-only"}:
-                sat_alloc = sat_allocation_trend
-                sat_top_n = top_n_trend
-            elif above_ma and in_trend:
-                sat_alloc = sat_allocation_trend
-                sat_top_n = top_n_trend
-            else:
-                sat_alloc = sat_allocation_defense
-                sat_top_n = top_n_defense
-
-            # 分配核心与卫星
-            _alloc_core_fixed(target)
-            _alloc_satellite(target, date, sat_alloc, sat_top_n)
+    for i in rebalance_pos:
+        date = close_df.index[i]
+        target: dict[str, float] = {}
+        # 市场状态
+        above_ma = above_ma_all[i]
+        in_trend = in_trend_all[i]
+
+        # 配置卫星参数：纯卫星模式不启用动态防守/CHOP/MA200，始终使用趋势期设置
+        if mode in {"sat", "sat-only"}:
+            sat_alloc = sat_allocation_trend
+            sat_top_n = top_n_trend
+        elif above_ma and in_trend:
+            sat_alloc = sat_allocation_trend
+            sat_top_n = top_n_trend
+        else:
+            sat_alloc = sat_allocation_defense
+            sat_top_n = top_n_defense
 
-            # 是否把未使用的卫星差额回流核心：默认否（留现金）
-            # target 权重和可能 < 1
-            current_w = target
+        # 分配核心与卫星
+        _alloc_core_fixed(target)
+        _alloc_satellite(target, i, sat_alloc, sat_top_n)
 
-        if current_w:
-            for code, w in current_w.items():
-                weights.loc[date, code] = w
+        # 是否把未使用的卫星差额回流核心：默认否（留现金）
+        # target 权重和可能 < 1
+        current_w = target
+        target_rows[date] = target
 
-    shifted = weights.shift().ffill().fillna(0.0)
-    portfolio_returns = (shifted * returns_df).sum(axis=1)
+    shifted = _lagged_weights(target_rows, close_df.index, close_df.columns)
+    portfolio_returns = pd.Series(_portfolio_returns(shifted, returns_arr), index=close_df.index)
 
     # 按多区间输出
     horizons = [
@@ -759,25 +1002,16 @@ def run_core_satellite_custom_backtest(
     rows: list[dict] = []
     last_weights = current_w.copy()
 
-    for label, offset in horizons:
-        start_candidate = end_date - offset
-        mask = close_df.index >= start_candidate
-        if not mask.any():
-            continue
-        slice_returns = portfolio_returns.loc[mask]
-        metrics = calculate_performance_metrics(slice_returns)
+    # 各区间均为同一收益序列的后缀：二分定位起点后一次性计算指标
+    starts = close_df.index.searchsorted([end_date - offset for _, offset in horizons])
+    horizon_metrics = _suffix_performance_metrics(portfolio_returns, starts)
+    for (label, _), i0, metrics in zip(horizons, starts, horizon_metrics):
         if metrics["days"] == 0:
             continue
-        def _fmt_pct(x: float, digits=2):
-            import numpy as _np
-            return "-" if _np.isnan(x) else f"{x:.{digits}%}"
-        def _fmt_num(x):
-            import numpy as _np
-            return "-" if _np.isnan(x) else f"{x:.2f}"
         row = {
             "label": label,
-            "start": str(slice_returns.index.min().date()),
-            "end": str(slice_returns.index.max().date()),
+            "start": str(close_df.index[i0].date()),
+            "end": str(end_date.date()),
             "days": str(metrics["days"]),
             "total": _fmt_pct(metrics["total_return"]),
             "annual": _fmt_pct(metrics["annualized"]),
@@ -786,18 +1020,7 @@ def run_core_satellite_custom_backtest(
             "sharpe": _fmt_num(metrics["sharpe"]),
             "note": "",
         }
-        import numpy as _np
-        if not _np.isnan(metrics["total_return"]):
-            if metrics["total_return"] >= 0:
-                row["style_total"] = "value_positive"
-                row["style_annual"] = "value_positive"
-            else:
-                row["style_total"] = "value_negative"
-                row["style_annual"] = "value_negative"
-        if not _np.isnan(metrics["max_drawdown"]):
-            row["style_maxdd"] = "value_negative" if metrics["max_drawdown"] < 0 else "value_positive"
-        if not _np.isnan(metrics["sharpe"]):
-            row["style_sharpe"] = "accent" if metrics["sharpe"] > 0 else "warning"
+        _apply_metric_styles(row, metrics)
         rows.append(row)
 
     print(colorize_func("\n=== 核心-卫星（自定义）多区间回测 ===", "heading"))
@@ -805,16 +1028,11 @@ def run_core_satellite_custom_backtest(
     try:
         prev_month_end = (end_date - pd.offsets.MonthBegin(1)) - pd.Timedelta(days=1)
         prev_month_start = (prev_month_end.replace(day=1))
-        mask_month = (close_df.index >= prev_month_start) & (close_df.index <= prev_month_end)
-        slice_returns = portfolio_returns.loc[mask_month]
+        m0 = close_df.index.searchsorted(prev_month_start)
+        m1 = close_df.index.searchsorted(prev_month_end, side="right")
+        slice_returns = portfolio_returns.iloc[m0:m1]
         metrics = calculate_performance_metrics(slice_returns)
         if metrics["days"] > 0:
-            def _fmt_pct(x: float, digits=2):
-                import numpy as _np
-                return "-" if _np.isnan(x) else f"{x:.{digits}%}"
-            def _fmt_num(x):
-                import numpy as _np
-                return "-" if _np.isnan(x) else f"{x:.2f}"
             row = {
                 "label": "近1个月",
                 "start": str(slice_returns.index.min().date()),
@@ -827,18 +1045,7 @@ def run_core_satellite_custom_backtest(
                 "sharpe": _fmt_num(metrics["sharpe"]),
                 "note": "",
             }
-            import numpy as _np
-            if not _np.isnan(metrics["total_return"]):
-                if metrics["total_return"] >= 0:
-                    row["style_total"] = "value_positive"
-                    row["style_annual"] = "value_positive"
-                else:
-                    row["style_total"] = "value_negative"
-                    row["style_annual"] = "value_negative"
-            if not _np.isnan(metrics["max_drawdown"]):
-                row["style_maxdd"] = "value_negative" if metrics["max_drawdown"] < 0 else "value_positive"
-            if not _np.isnan(metrics["sharpe"]):
-                row["style_sharpe"] = "accent" if metrics["sharpe"] > 0 else "warning"
+            _apply_metric_styles(row, metrics)
             rows.append(row)
     except Exception:
         pass
@@ -849,13 +1056,134 @@ def run_core_satellite_custom_backtest(
 
     if last_weights:
         sorted_holdings = sorted(last_weights.items(), key=lambda kv: kv[1], reverse=True)
-        lines = [f"{format_label_func(code)}: {w:.1%}" for code, w in sorted_holdings]
+        lines = [f"{label_of(code)}: {w:.1%}" for code, w in sorted_holdings]
         print(colorize_func("\n最新权重:", "heading"))
         print(colorize_func("; ".join(lines), "menu_text"))
 
     wait_for_ack_func()
 
 
+def _enhanced_rebalance_kernel(
+    n_cols,
+    rebalance_pos,
+    next_trigger,
+    trigger_col,
+    core_idx,
+    sat_idx,
+    sat_mom,
+    sat_alloc_arr,
+    core_allocation,
+    top_n,
+    enable_stop_loss,
+    enable_rebalance,
+    rebalance_threshold,
+):
+    """
+    增强回测的调仓主循环（纯数组实现，可被 numba 编译）
+
+    持仓以长度 N 的权重向量 + 持有掩码表示，rank 记录持仓字典的插入顺序。
+    返回每日权重矩阵、期末持仓、止损事件（日期、列）以及各调仓日是否触发再平衡。
+    """
+    n_days = sat_mom.shape[0]
+    n_reb = len(rebalance_pos)
+    weights_arr = np.zeros((n_days, n_cols))
+    cur = np.zeros(n_cols)
+    held = np.zeros(n_cols, dtype=np.bool_)
+    rank = np.zeros(n_cols, dtype=np.int64)
+    stopped = np.zeros(n_cols, dtype=np.bool_)
+    stop_day = np.empty(n_cols, dtype=np.int64)
+    stop_col = np.empty(n_cols, dtype=np.int64)
+    n_stops = 0
+    rebalanced = np.zeros(n_reb, dtype=np.bool_)
+
+    seg_start = 0
+    for k in range(n_reb + 1):
+        # 当日先检查止损，再执行调仓；两次调仓之间持仓只会因止损而减少
+        seg_last = n_days - 1 if k == n_reb else rebalance_pos[k]
+        if seg_start <= seg_last:
+            held_cols = np.flatnonzero(held)
+            held_cols = held_cols[np.argsort(rank[held_cols], kind="mergesort")]
+            seg_days = np.empty(len(held_cols), dtype=np.int64)
+            seg_cols = np.empty(len(held_cols), dtype=np.int64)
+            m = 0
+            for j in held_cols:
+                hold_end = seg_last + 1
+                if enable_stop_loss and not stopped[j] and trigger_col[j] >= 0:
+                    t = next_trigger[seg_start, trigger_col[j]]
+                    if t <= seg_last:
+                        hold_end = t
+                        seg_days[m] = t
+                        seg_cols[m] = j
+                        m += 1
+                weights_arr[seg_start:hold_end, j] = cur[j]
+            for q in np.argsort(seg_days[:m], kind="mergesort"):
+                j = seg_cols[q]
+                stopped[j] = True
+                held[j] = False
+                cur[j] = 0.0
+                stop_day[n_stops] = seg_days[q]
+                stop_col[n_stops] = j
+                n_stops += 1
+            seg_start = seg_last + 1
+        if k == n_reb:
+            break
+
+        r = rebalance_pos[k]
+        tgt = np.zeros(n_cols)
+        tgt_held = np.zeros(n_cols, dtype=np.bool_)
+        tgt_rank = np.zeros(n_cols, dtype=np.int64)
+        count = 0
+
+        # 分配核心仓（等权）
+        if len(core_idx) > 0:
+            core_weight = core_allocation / len(core_idx)
+            for j in core_idx:
+                tgt[j] = core_weight
+                if not tgt_held[j]:
+                    tgt_held[j] = True
+                    tgt_rank[j] = count
+                    count += 1
+
+        # 分配卫星仓（择优TopN，排除已止损的ETF）
+        sat_alloc = sat_alloc_arr[r]
+        if len(sat_idx) > 0 and sat_alloc > 0:
+            scores = sat_mom[r]
+            valid = np.zeros(len(sat_idx), dtype=np.bool_)
+            for s in range(len(sat_idx)):
+                valid[s] = not stopped[sat_idx[s]] and not np.isnan(scores[s])
+            if valid.any():
+                cand = np.flatnonzero(valid)
+                # 稳定排序保证动量并列时按原顺序取前 N
+                picks = cand[np.argsort(-scores[cand], kind="mergesort")][:top_n]
+                sat_weight = sat_alloc / len(picks)
+                for q in picks:
+                    j = sat_idx[q]
+                    tgt[j] += sat_weight
+                    if not tgt_held[j]:
+                        tgt_held[j] = True
+                        tgt_rank[j] = count
+                        count += 1
+
+        # 再平衡检查：仅当目标权重偏离超过阈值时才调仓
+        if enable_rebalance and held.any():
+            need_rebalance = False
+            for j in range(n_cols):
+                if tgt_held[j] and abs(tgt[j] - cur[j]) > rebalance_threshold:
+                    need_rebalance = True
+                    break
+            if need_rebalance:
+                rebalanced[k] = True
+                cur, held, rank = tgt, tgt_held, tgt_rank
+        else:
+            cur, held, rank = tgt, tgt_held, tgt_rank
+
+        weights_arr[r] = cur
+
+    return weights_arr, cur, held, rank, stop_day[:n_stops], stop_col[:n_stops], rebalanced
+
+
+if _njit is not None:  # pragma: no cover - 可选依赖
+    _enhanced_rebalance_kernel = _njit(cache=True)(_enhanced_rebalance_kernel)
 
 
 def run_core_satellite_enhanced_backtest(
@@ -893,26 +1221,27 @@ def run_core_satellite_enhanced_backtest(
     5. 防御：大盘MA200以下时，降低卫星仓至20%
     """
 
+    label_of = _memo_label(format_label_func)
     context = obtain_context_func(last_state, allow_reuse=False)
     if not context:
         return
 
     result = context["result"]
     momentum_df = result.momentum_scores
-    close_df = pd.DataFrame({code: data["close"] for code, data in result.raw_data.items()}).sort_index().dropna(how="all")
+    close_df = _materialize_close_df(result)
 
     if close_df.empty or momentum_df.empty:
         print(colorize_func("无法回测：数据为空。", "warning"))
         return
 
     # 对齐动量与价格
-    common_dates = close_df.index.intersection(momentum_df.index)
+    # 先对交集日期排序（C ≤ T），避免 .loc 之后再对整张 T×N 表 sort_index
+    common_dates = close_df.index.intersection(momentum_df.index).sort_values()
     if len(common_dates) < 20:
         print(colorize_func("重叠区间过短，无法回测。", "warning"))
         return
 
-    close_df = close_df.loc[common_dates].sort_index()
-    returns_df = close_df.pct_change().fillna(0.0)
+    close_df = close_df.loc[common_dates]
     momentum_df = momentum_df.loc[common_dates]
 
     # 获取核心和卫星券池
@@ -933,108 +1262,77 @@ def run_core_satellite_enhanced_backtest(
     # 市场代理（用于防御判断）
     market_code = "510300.XSHG" if "510300.XSHG" in close_df.columns else (core_set[0] if core_set else None)
     market_close = close_df[market_code] if market_code else None
-    ma200 = market_close.rolling(window=defense_ma_window, min_periods=1).mean() if market_close is not None else None
-
-    # 初始化
-    weights = pd.DataFrame(0.0, index=close_df.index, columns=close_df.columns)
-    current_w: dict[str, float] = {}
-    high_water_mark: dict[str, float] = {}  # 记录每只ETF的最高点
-    stop_loss_triggered: set[str] = set()  # 已触发止损的ETF
-    rebalance_log: list[dict] = []  # 调仓记录
-
-    for date in close_df.index:
-        # 更新最高点
-        for code in close_df.columns:
-            if code not in high_water_mark:
-                high_water_mark[code] = close_df.loc[date, code]
-            else:
-                high_water_mark[code] = max(high_water_mark[code], close_df.loc[date, code])
-
-        # 检查止损
-        if enable_stop_loss:
-            for code in list(current_w.keys()):
-                if code in stop_loss_triggered:
-                    continue
-                current_price = close_df.loc[date, code]
-                high = high_water_mark.get(code, current_price)
-                drawdown = (current_price - high) / high if high > 0 else 0
-
-                if drawdown < -stop_loss_pct:
-                    # 触发止损
-                    stop_loss_triggered.add(code)
-                    if code in current_w:
-                        del current_w[code]
-                    rebalance_log.append({
-                        "date": str(date.date()),
-                        "action": "STOP_LOSS",
-                        "code": code,
-                        "price": float(current_price),
-                        "drawdown": float(drawdown),
-                    })
-
-        # 调仓日
-        if date in rebalance_dates:
-            target: dict[str, float] = {}
-
-            # 判断市场状态（防御）
-            above_ma = False
-            if enable_defense and market_close is not None and ma200 is not None:
-                if not pd.isna(market_close.loc[date]) and not pd.isna(ma200.loc[date]):
-                    above_ma = market_close.loc[date] > ma200.loc[date]
-
-            # 确定卫星仓配置
-            if enable_defense and not above_ma:
-                sat_alloc = defense_satellite_allocation
-            else:
-                sat_alloc = satellite_allocation
-
-            # 分配核心仓（等权）
-            if core_set:
-                core_weight = core_allocation / len(core_set)
-                for code in core_set:
-                    target[code] = core_weight
-
-            # 分配卫星仓（择优TopN）
-            if sat_set and sat_alloc > 0:
-                # 排除已止损的ETF
-                available_sat = [c for c in sat_set if c not in stop_loss_triggered]
-                if available_sat:
-                    scores = momentum_df.loc[date, available_sat].dropna()
-                    if not scores.empty:
-                        picks = scores.sort_values(ascending=False).head(top_n).index.tolist()
-                        sat_weight = sat_alloc / len(picks)
-                        for code in picks:
-                            target[code] = target.get(code, 0.0) + sat_weight
-
-            # 再平衡检查
-            if enable_rebalance and current_w:
-                need_rebalance = False
-                for code, target_weight in target.items():
-                    current_weight = current_w.get(code, 0.0)
-                    if abs(target_weight - current_weight) > rebalance_threshold:
-                        need_rebalance = True
-                        break
 
-                if need_rebalance:
-                    rebalance_log.append({
-                        "date": str(date.date()),
-                        "action": "REBALANCE",
-                        "from": dict(current_w),
-                        "to": dict(target),
-                    })
-                    current_w = target
-                # 否则保持当前权重
-            else:
-                current_w = target
+    close_arr = close_df.to_numpy(dtype=float)
+    returns_arr = _daily_returns(close_arr)
+    n_days, n_cols = close_arr.shape
+    col_pos = {code: j for j, code in enumerate(close_df.columns)}
+    sat_mom_arr = momentum_df.reindex(index=close_df.index, columns=sat_set).to_numpy(dtype=float)
+
+    # 防御：均线只在启用防御时计算一次，预先算出每日的卫星仓配置
+    above_ma_all = np.zeros(n_days, dtype=bool)
+    if enable_defense and market_close is not None:
+        market_arr = market_close.to_numpy(dtype=float)
+        ma200_arr = _rolling_mean(market_arr, defense_ma_window)
+        with np.errstate(invalid="ignore"):
+            above_ma_all = (market_arr > ma200_arr) & ~np.isnan(market_arr) & ~np.isnan(ma200_arr)
+    if enable_defense:
+        sat_alloc_arr = np.where(above_ma_all, satellite_allocation, defense_satellite_allocation)
+    else:
+        sat_alloc_arr = np.full(n_days, satellite_allocation, dtype=float)
+
+    core_idx = np.array([col_pos[c] for c in core_set], dtype=np.int64)
+    sat_idx = np.array([col_pos[c] for c in sat_set], dtype=np.int64)
+
+    # 止损：只有核心/卫星池内的标的可能被持有，仅对这些列一次性计算最高点与回撤
+    # next_trigger[i, k] 为第 i 日及之后第 k 个受跟踪标的首次触发止损的位置（无则为 n_days），
+    # trigger_col 将列号映射到受跟踪序号（-1 表示不跟踪）
+    trigger_col = np.full(n_cols, -1, dtype=np.int64)
+    if enable_stop_loss:
+        tracked = np.unique(np.concatenate([core_idx, sat_idx]))
+        trigger_col[tracked] = np.arange(len(tracked))
+        tracked_close = close_arr[:, tracked]
+        # 与逐日 max() 更新一致：缺失价格不刷新最高点；首日即缺失的标的没有有效最高点，不参与止损
+        high_arr = np.fmax.accumulate(tracked_close, axis=0)
+        high_arr[:, np.isnan(tracked_close[0])] = np.nan
+        with np.errstate(divide="ignore", invalid="ignore"):
+            drawdown_arr = np.where(high_arr > 0, (tracked_close - high_arr) / high_arr, 0.0)
+        triggered = drawdown_arr < -stop_loss_pct
+        next_trigger = np.where(triggered, np.arange(n_days)[:, None], n_days)
+        next_trigger = np.minimum.accumulate(next_trigger[::-1], axis=0)[::-1]
+    else:
+        next_trigger = np.empty((1, 0), dtype=np.int64)
+
+    rebalance_pos = np.flatnonzero(close_df.index.isin(rebalance_dates))
+    weights_arr, final_w, final_held, final_rank, stop_day, stop_col, rebalanced = _enhanced_rebalance_kernel(
+        n_cols,
+        rebalance_pos.astype(np.int64),
+        np.ascontiguousarray(next_trigger, dtype=np.int64),
+        trigger_col,
+        core_idx,
+        sat_idx,
+        sat_mom_arr,
+        sat_alloc_arr.astype(float),
+        float(core_allocation),
+        int(top_n),
+        bool(enable_stop_loss),
+        bool(enable_rebalance),
+        float(rebalance_threshold),
+    )
 
-        # 应用权重
-        if current_w:
-            for code, w in current_w.items():
-                weights.loc[date, code] = w
+    # 还原期末持仓（保持原有插入顺序）与止损集合
+    columns = close_df.columns
+    held_cols = np.flatnonzero(final_held)
+    held_cols = held_cols[np.argsort(final_rank[held_cols], kind="stable")]
+    current_w: dict[str, float] = {columns[j]: float(final_w[j]) for j in held_cols}
+    stop_loss_triggered: set[str] = set()  # 已触发止损的ETF
+    for j in stop_col.tolist():
+        stop_loss_triggered.add(columns[j])
 
-    # 计算收益
-    shifted = weights.shift().ffill().fillna(0.0)
-    portfolio_returns = (shifted * returns_df).sum(axis=1)
+    # 计算收益：权重滞后一日生效
+    shifted = np.zeros_like(weights_arr)
+    shifted[1:] = weights_arr[:-1]
+    portfolio_returns = pd.Series(_portfolio_returns(shifted, returns_arr), index=close_df.index)
 
     # 多区间回测
     horizons = [
@@ -1049,30 +1347,17 @@ def run_core_satellite_enhanced_backtest(
     end_date = close_df.index.max()
     rows = []
 
-    for label, offset in horizons:
-        start_candidate = end_date - offset
-        mask = close_df.index >= start_candidate
-        slice_returns = portfolio_returns.loc[mask]
-
-        if slice_returns.empty:
-            continue
-
-        metrics = calculate_performance_metrics(slice_returns)
+    # 各区间均为同一收益序列的后缀：二分定位起点后一次性计算指标
+    starts = close_df.index.searchsorted([end_date - offset for _, offset in horizons])
+    horizon_metrics = _suffix_performance_metrics(portfolio_returns, starts)
+    for (label, _), i0, metrics in zip(horizons, starts, horizon_metrics):
         if metrics["days"] == 0:
             continue
 
-        def _fmt_pct(x: float, digits=2):
-            import numpy as _np
-            return "-" if _np.isnan(x) else f"{x:.{digits}%}"
-
-        def _fmt_num(x):
-            import numpy as _np
-            return "-" if _np.isnan(x) else f"{x:.2f}"
-
         row = {
             "label": label,
-            "start": str(slice_returns.index.min().date()),
-            "end": str(slice_returns.index.max().date()),
+            "start": str(close_df.index[i0].date()),
+            "end": str(end_date.date()),
             "days": str(metrics["days"]),
             "total": _fmt_pct(metrics["total_return"]),
             "annual": _fmt_pct(metrics["annualized"]),
@@ -1082,18 +1367,7 @@ def run_core_satellite_enhanced_backtest(
             "note": "",
         }
 
-        import numpy as _np
-        if not _np.isnan(metrics["total_return"]):
-            if metrics["total_return"] >= 0:
-                row["style_total"] = "value_positive"
-                row["style_annual"] = "value_positive"
-            else:
-                row["style_total"] = "value_negative"
-                row["style_annual"] = "value_negative"
-        if not _np.isnan(metrics["max_drawdown"]):
-            row["style_maxdd"] = "value_negative" if metrics["max_drawdown"] < 0 else "value_positive"
-        if not _np.isnan(metrics["sharpe"]):
-            row["style_sharpe"] = "accent" if metrics["sharpe"] > 0 else "warning"
+        _apply_metric_styles(row, metrics)
 
         rows.append(row)
 
@@ -1111,7 +1385,7 @@ def run_core_satellite_enhanced_backtest(
     # 显示最新权重
     if current_w:
         sorted_holdings = sorted(current_w.items(), key=lambda kv: kv[1], reverse=True)
-        lines = [f"{format_label_func(code)}: {w:.1%}" for code, w in sorted_holdings]
+        lines = [f"{label_of(code)}: {w:.1%}" for code, w in sorted_holdings]
         print(colorize_func("\n最新权重:", "heading"))
         print(colorize_func("; ".join(lines), "menu_text"))
 
@@ -1119,11 +1393,12 @@ def run_core_satellite_enhanced_backtest(
     if stop_loss_triggered:
         print(colorize_func(f"\n⚠️  已触发止损的ETF ({len(stop_loss_triggered)}只):", "warning"))
         for code in stop_loss_triggered:
-            print(colorize_func(f"  • {format_label_func(code)}", "menu_text"))
+            print(colorize_func(f"  • {label_of(code)}", "menu_text"))
 
     # 显示调仓统计
-    rebalance_count = len([log for log in rebalance_log if log["action"] == "REBALANCE"])
-    stop_loss_count = len([log for log in rebalance_log if log["action"] == "STOP_LOSS"])
+    # 调仓记录只用于统计次数：每次止损对应一个 stop_day，每次再平衡对应一个 rebalanced 标记
+    rebalance_count = int(np.count_nonzero(rebalanced))
+    stop_loss_count = len(stop_day)
     print(colorize_func(f"\n📊 调仓统计: 再平衡{rebalance_count}次 | 止损{stop_loss_count}次", "accent"))
 
     wait_for_ack_func()
@@ -7,6 +7,17 @@ from pathlib import Path
 from typing import Any, Callable, Dict, Optional
 
 
+def _run_streaming(command: list) -> int:
+    """运行子进程并让其直接继承终端输出（保留 TTY 与回车进度刷新），返回退出码"""
+    process = subprocess.Popen(command, cwd=str(Path.home()))
+    try:
+        return process.wait()
+    except KeyboardInterrupt:
+        process.kill()
+        process.wait()
+        raise
+
+
 def update_data_bundle_interactive(
     bundle_status_func: Callable[[bool, Optional[Dict]], Dict[str, Any]],
     find_rqalpha_func: Callable[[], Optional[list]],
@@ -41,15 +52,13 @@ def update_data_bundle_interactive(
     print(colorize_func("开始下载最新的 RQAlpha 数据包，这可能需要几分钟……", "info"))
     download_command = command + ["download-bundle"]
     try:
-        download_result = subprocess.run(
-            download_command, cwd=str(Path.home()), check=False
-        )
+        download_returncode = _run_streaming(download_command)
     except Exception as exc:
         print(colorize_func(f"download-bundle 调用失败: {exc}", "danger"))
         wait_for_ack_func()
         return
     
-    if download_result.returncode == 0:
+    if download_returncode == 0:
         bundle_path = Path.home() / ".rqalpha" / "bundle"
         print(colorize_func("数据下载完成，分析将基于最新 bundle。", "value_positive"))
         print(colorize_func(
@@ -63,20 +72,20 @@ def update_data_bundle_interactive(
     printable_dl = " ".join(download_command)
     print(
         colorize_func(
-            f"download-bundle 失败（退出码 {download_result.returncode}）。正在尝试 rqalpha update-bundle……",
+            f"download-bundle 失败（退出码 {download_returncode}）。正在尝试 rqalpha update-bundle……",
             "warning",
         )
     )
     
     update_command = command + ["update-bundle"]
     try:
-        update_result = subprocess.run(update_command, cwd=str(Path.home()), check=False)
+        update_returncode = _run_streaming(update_command)
     except Exception as exc:
         print(colorize_func(f"update-bundle 调用失败: {exc}", "danger"))
         wait_for_ack_func()
         return
     
-    if update_result.returncode == 0:
+    if update_returncode == 0:
         bundle_path = Path.home() / ".rqalpha" / "bundle"
         print(colorize_func("数据更新完成，分析将基于最新 bundle。", "value_positive"))
         print(colorize_func(
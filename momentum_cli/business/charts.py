@@ -3,6 +3,7 @@
 """
 from __future__ import annotations
 
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional, Iterable, Set
 
@@ -52,74 +53,83 @@ def generate_interactive_plot(
     figure = go.Figure()
     default_visible = {str(c).upper() for c in default_visible_codes} if default_visible_codes else None
 
+    # 缺失值掩码只计算一次：起点推断与剔除全空行共用
+    notna = data.notna().to_numpy()
+    keep = notna.any(axis=1)
     start_index: Optional[pd.Timestamp] = data.index.min() if not data.empty else None
     target_start: Optional[pd.Timestamp] = None
     if default_visible and data.index.size:
-        col_map = {str(col).upper(): col for col in data.columns}
+        col_pos = {str(col).upper(): j for j, col in enumerate(data.columns)}
         first_indices: list[pd.Timestamp] = []
         for code in default_visible:
-            column = col_map.get(code)
-            if column is None:
+            j = col_pos.get(code)
+            if j is None or not notna[:, j].any():
                 continue
-            first_valid = data[column].first_valid_index()
-            if first_valid is not None:
-                first_indices.append(first_valid)
+            first_indices.append(data.index[notna[:, j].argmax()])
         if first_indices:
             target_start = min(first_indices)
-    if target_start is None and not data.empty:
-        non_empty = data.dropna(how="all")
-        if not non_empty.empty:
-            target_start = non_empty.index.min()
+    if target_start is None and keep.any():
+        target_start = data.index[keep].min()
     if target_start is not None and start_index is not None:
         threshold = pd.Timedelta(days=45)
         if target_start - start_index <= threshold:
-            data = data[data.index >= target_start]
-    data = data.dropna(how="all")
+            keep &= data.index >= target_start
+    if not keep.all():
+        data = data[keep]
 
+    label_of = lru_cache(maxsize=4096)(format_label_func) if format_label_func else str
     trace_codes = [str(col).upper() for col in data.columns]
-    for column, code_upper in zip(data.columns, trace_codes):
+
+    # 分组/可见性掩码单次遍历算出，供图例分组与按钮共用
+    core_fs = frozenset(core_codes or ())
+    sat_fs = frozenset(satellite_codes or ())
+    default_fs = frozenset(default_visible or ())
+    is_core: list[bool] = []
+    is_sat: list[bool] = []
+    is_default: list[bool] = []
+    is_other: list[bool] = []
+    for code in trace_codes:
+        in_core = code in core_fs
+        in_sat = code in sat_fs
+        is_core.append(in_core)
+        is_sat.append(in_sat)
+        is_default.append(code in default_fs)
+        is_other.append(not in_core and not in_sat)
+
+    x_values = data.index.to_numpy()
+    values = data.to_numpy()
+    traces = []
+    for j, column in enumerate(data.columns):
         visible_state: bool | str = True
-        if default_visible and code_upper not in default_visible:
+        if default_fs and not is_default[j]:
             visible_state = "legendonly"
-        legend_group = (
-            "CORE" if core_codes and code_upper in core_codes else (
-                "SAT" if satellite_codes and code_upper in satellite_codes else "OTHER"
-            )
-        )
-        label = format_label_func(column) if format_label_func else str(column)
-        figure.add_trace(
+        legend_group = "CORE" if is_core[j] else ("SAT" if is_sat[j] else "OTHER")
+        traces.append(
             go.Scatter(
-                x=data.index,
-                y=data[column],
+                x=x_values,
+                y=values[:, j],
                 mode="lines",
-                name=label,
+                name=label_of(column),
                 legendgroup=legend_group,
                 line={"width": line_width},
                 visible=visible_state,
             )
         )
+    # 一次性批量添加，避免逐条 add_trace 重复触发图对象校验与重排
+    if traces:
+        figure.add_traces(traces)
 
     buttons: list[dict] = []
     all_visible = [True] * len(trace_codes)
     buttons.append({"label": "全部", "method": "update", "args": [{"visible": all_visible}]})
-    if default_visible:
-        default_mask = [code in default_visible for code in trace_codes]
-        if any(default_mask) and any(v is False for v in default_mask):
-            buttons.append({"label": "前 6", "method": "update", "args": [{"visible": default_mask}]})
-    if core_codes:
-        core_visible = [code in core_codes for code in trace_codes]
-        if any(core_visible):
-            buttons.append({"label": "仅核心", "method": "update", "args": [{"visible": core_visible}]})
-    if satellite_codes:
-        sat_visible = [code in satellite_codes for code in trace_codes]
-        if any(sat_visible):
-            buttons.append({"label": "仅卫星", "method": "update", "args": [{"visible": sat_visible}]})
-    other_visible = [
-        code not in (core_codes or set()) and code not in (satellite_codes or set())
-        for code in trace_codes
-    ]
-    if any(other_visible):
-        buttons.append({"label": "仅其他", "method": "update", "args": [{"visible": other_visible}]})
+    if default_fs and any(is_default) and not all(is_default):
+        buttons.append({"label": "前 6", "method": "update", "args": [{"visible": is_default}]})
+    if core_fs and any(is_core):
+        buttons.append({"label": "仅核心", "method": "update", "args": [{"visible": is_core}]})
+    if sat_fs and any(is_sat):
+        buttons.append({"label": "仅卫星", "method": "update", "args": [{"visible": is_sat}]})
+    if any(is_other):
+        buttons.append({"label": "仅其他", "method": "update", "args": [{"visible": is_other}]})
 
     legend_height_padding = max(0, len(trace_codes) - 12) * 22
     figure.update_layout(
@@ -155,8 +165,20 @@ def generate_interactive_plot(
     if invert_y:
         figure.update_yaxes(autorange="reversed")
 
+    import plotly.io as pio  # type: ignore
+
     output_dir.mkdir(parents=True, exist_ok=True)
     path = output_dir / filename
-    figure.write_html(str(path), include_plotlyjs="cdn")
+    # 写入已打开的文件句柄；图对象在添加轨迹时已校验，输出时跳过重复校验
+    with path.open("w", encoding="utf-8") as handle:
+        pio.write_html(
+            figure,
+            file=handle,
+            config={"responsive": True},
+            include_plotlyjs="cdn",
+            auto_open=False,
+            full_html=True,
+            validate=False,
+        )
     return path
 
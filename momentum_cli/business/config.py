@@ -4,7 +4,77 @@
 """
 from __future__ import annotations
 
-from typing import Any, Callable, Dict, List, Optional
+import math
+from functools import lru_cache
+from typing import TYPE_CHECKING
+
+from ..ui.menu import MenuOption
+
+if TYPE_CHECKING:
+    from typing import Any, Callable, Dict, Final, List, Optional
+
+# 菜单标题与提示为固定文本，导入时构造一次
+_TITLE_CORR: Final[str] = "┌─ 相关矩阵阈值 ─" + "─" * 18
+_TITLE_PLOT: Final[str] = "┌─ 图表样式设置 ─" + "─" * 18
+_TITLE_THEME: Final[str] = "┌─ 终端主题与色彩 ─" + "─" * 18
+_TITLE_SIGNAL: Final[str] = "┌─ 动量与趋势阈值 ─" + "─" * 16
+_TITLE_STABILITY: Final[str] = "┌─ 稳定度参数设置 ─" + "─" * 14
+_TITLE_STABILITY_METHOD: Final[str] = "┌─ 选择稳定度方法 ─" + "─" * 12
+_HINT_COMMON: Final[str] = "↑/↓ 选择 · 回车确认 · 数字快捷 · ESC/q 返回"
+
+_ESCAPE_CHOICES: Final = frozenset(("0", "__escape__"))
+
+# 菜单序号文本，按 idx - 1 取用
+_IDX_STR: Final = tuple(str(i) for i in range(1, 32))
+
+_PLOT_TEMPLATES: Final = (
+    "plotly_white",
+    "plotly_dark",
+    "presentation",
+    "ggplot2",
+    "seaborn",
+    "simple_white",
+)
+_PLOT_TEMPLATE_SET: Final = frozenset(_PLOT_TEMPLATES)
+
+# 连续无效输入的重试上限，避免管道输入时原地空转
+_MAX_INVALID_RETRIES: Final = 3
+
+_MISSING: Final = object()
+
+# 固定菜单选项（菜单函数只读取选项，可直接共享）
+_BACK_OPTION: Final = MenuOption("0", "返回上级菜单")
+
+# 相关矩阵阈值预设与菜单
+_CORR_PRESETS: Final = {"1": 0.6, "2": 0.8, "3": 0.85}
+_CORR_OPTIONS: Final = (
+    MenuOption("1", "设为 0.60"),
+    MenuOption("2", "设为 0.80"),
+    MenuOption("3", "设为 0.85"),
+    MenuOption("4", "自定义输入"),
+    _BACK_OPTION,
+)
+
+_STABILITY_OPTIONS: Final = (
+    MenuOption("1", "切换稳定度方法"),
+    MenuOption("2", "调整稳定度窗口"),
+    MenuOption("3", "设置 Top-N 门槛"),
+    MenuOption("4", "设置稳定度权重"),
+    _BACK_OPTION,
+)
+_STABILITY_METHOD_OPTIONS: Final = (
+    MenuOption("presence_ratio", "Top-10 存活率 (presence_ratio)", display="1"),
+    MenuOption("kendall", "Kendall-τ 排名连贯度 (kendall)", display="2"),
+)
+
+
+def _warn(colorize_func: Callable, message: str) -> None:
+    """打印一条警告提示。
+
+    着色结果依赖当前终端主题，这里不做跨调用缓存；在主题不变的菜单里，
+    调用方传入的 colorize_func 已按会话做了 lru_cache。
+    """
+    print(colorize_func(message, "warning"))
 
 
 def configure_correlation_threshold_interactive(
@@ -25,49 +95,36 @@ def configure_correlation_threshold_interactive(
         colorize_func: 着色函数
         prompt_input_func: 输入提示函数
     """
-    presets = {
-        "1": 0.6,
-        "2": 0.8,
-        "3": 0.85,
-    }
-    options = [
-        {"key": "1", "label": "设为 0.60"},
-        {"key": "2", "label": "设为 0.80"},
-        {"key": "3", "label": "设为 0.85"},
-        {"key": "4", "label": "自定义输入"},
-        {"key": "0", "label": "返回上级菜单"},
-    ]
     header_lines = [
         "",
         colorize_func(f"当前阈值: {current_threshold:.2f}", "menu_text"),
     ]
     choice = prompt_menu_choice_func(
-        options,
-        title="┌─ 相关矩阵阈值 ─" + "─" * 18,
+        _CORR_OPTIONS,
+        title=_TITLE_CORR,
         header_lines=header_lines,
-        hint="↑/↓ 选择 · 回车确认 · 数字快捷 · ESC/q 返回",
+        hint=_HINT_COMMON,
         default_key="0",
     ).strip()
 
-    if not choice or choice in {"0", "__escape__"}:
+    if not choice or choice in _ESCAPE_CHOICES:
         return
 
-    if choice in presets:
-        new_value = presets[choice]
-    elif choice == "4":
+    new_value = _CORR_PRESETS.get(choice, _MISSING)
+    if new_value is _MISSING:
+        if choice != "4":
+            _warn(colorize_func, "输入无效，阈值保持不变。")
+            return
         raw = prompt_input_func(colorize_func("请输入 0-1 之间的小数，例如 0.75: ", "prompt")).strip()
         try:
             new_value = float(raw)
         except ValueError:
-            print(colorize_func("输入无效，阈值保持不变。", "warning"))
+            _warn(colorize_func, "输入无效，阈值保持不变。")
             return
-    else:
-        print(colorize_func("输入无效，阈值保持不变。", "warning"))
-        return
 
     validated = validate_func(new_value)
     if validated != new_value:
-        print(colorize_func("输入超出范围，已自动调整到有效区间。", "warning"))
+        _warn(colorize_func, "输入超出范围，已自动调整到有效区间。")
 
     updated = set_threshold_func(validated)
     print(colorize_func(f"相关矩阵预警阈值已更新为 {updated:.2f}。", "value_positive"))
@@ -97,82 +154,91 @@ def configure_plot_style_interactive(
         colorize_func: 着色函数
         prompt_input_func: 输入提示函数
     """
-    templates = [
-        "plotly_white",
-        "plotly_dark",
-        "presentation",
-        "ggplot2",
-        "seaborn",
-        "simple_white",
-    ]
-
-    print(colorize_func("当前图表样式：", "heading"))
-    print(colorize_func(f"主题: {current_template}", "menu_text"))
-    print(colorize_func(f"曲线宽度: {current_line_width}", "menu_text"))
-    current_theme = cli_theme_info.get(current_cli_theme, {"label": current_cli_theme})
+    # 本次会话内主题不会变化，重试时相同 (文本, 样式) 直接复用着色结果
+    colorize_func = lru_cache(maxsize=128)(colorize_func)
+    theme_entry = cli_theme_info.get(current_cli_theme)
+    theme_label = theme_entry.get("label", current_cli_theme) if theme_entry else current_cli_theme
+    # 状态区合并为一次输出，减少逐行写终端
     print(
-        colorize_func(
-            f"终端主题: {current_theme.get('label', current_cli_theme)} ({current_cli_theme})",
-            "menu_hint",
+        "\n".join(
+            (
+                colorize_func("当前图表样式：", "heading"),
+                colorize_func(f"主题: {current_template}", "menu_text"),
+                colorize_func(f"曲线宽度: {current_line_width}", "menu_text"),
+                colorize_func(
+                    f"终端主题: {theme_label} ({current_cli_theme})",
+                    "menu_hint",
+                ),
+            )
         )
     )
 
-    # 选择模板
-    while True:
-        options: List[Dict[str, Any]] = []
-        default_key = current_template
-        for idx, template in enumerate(templates, start=1):
-            marker = "✓" if template == current_template else " "
-            options.append(
-                {
-                    "key": template,
-                    "display": str(idx),
-                    "label": f"[{marker}] {template}",
-                }
-            )
-        options.append({"key": "0", "label": "返回上级菜单"})
-        choice = prompt_menu_choice_func(
-            options,
-            title="┌─ 图表样式设置 ─" + "─" * 18,
-            header_lines=[""],
-            hint="↑/↓ 选择 · 回车确认 · 数字快捷 · ESC/q 返回",
-            default_key=default_key,
+    # 选择模板：循环内当前模板不会变化（切换后即退出），选项只需构建一次
+    options: List[MenuOption] = [
+        MenuOption(
+            key=template,
+            label=f"[{'✓' if template == current_template else ' '}] {template}",
+            display=_IDX_STR[idx - 1],
         )
-        if choice in {"0", "__escape__"}:
-            break
-        if choice in templates:
-            set_template_func(choice)
-            print(colorize_func(f"已切换到 {choice} 主题。", "value_positive"))
+        for idx, template in enumerate(_PLOT_TEMPLATES, start=1)
+    ]
+    options.append(_BACK_OPTION)
+    for _ in range(_MAX_INVALID_RETRIES):
+        try:
+            choice = prompt_menu_choice_func(
+                options,
+                title=_TITLE_PLOT,
+                header_lines=[""],
+                hint=_HINT_COMMON,
+                default_key=current_template,
+            )
+        except (KeyboardInterrupt, EOFError):
+            return
+        if choice in _ESCAPE_CHOICES:
             break
-        if choice.isdigit():
+        selected: Optional[str] = None
+        if choice in _PLOT_TEMPLATE_SET:
+            selected = choice
+        elif choice.isdigit():
             idx = int(choice)
-            if 1 <= idx <= len(templates):
-                selected = templates[idx - 1]
-                set_template_func(selected)
-                print(colorize_func(f"已切换到 {selected} 主题。", "value_positive"))
-                break
-        print(colorize_func("输入无效，请重新选择。", "warning"))
+            if 1 <= idx <= len(_PLOT_TEMPLATES):
+                selected = _PLOT_TEMPLATES[idx - 1]
+        if selected is None:
+            _warn(colorize_func, "输入无效，请重新选择。")
+            continue
+        if selected == current_template:
+            print(colorize_func("当前已经是该主题。", "info"))
+        else:
+            set_template_func(selected)
+            print(colorize_func(f"已切换到 {selected} 主题。", "value_positive"))
+        break
+    else:
+        _warn(colorize_func, "多次输入无效，返回上级菜单。")
+        return
 
     # 设置线宽
-    while True:
-        raw = prompt_input_func(
-            colorize_func("设置曲线宽度（示例 1.5，直接回车保持当前值）: ", "prompt")
-        ).strip()
+    for _ in range(_MAX_INVALID_RETRIES):
+        try:
+            raw = prompt_input_func(
+                colorize_func("设置曲线宽度（示例 1.5，直接回车保持当前值）: ", "prompt")
+            ).strip()
+        except (KeyboardInterrupt, EOFError):
+            return
         if not raw:
             break
         try:
             width = float(raw)
         except ValueError:
-            print(colorize_func("请输入数值，例如 1.5。", "warning"))
+            _warn(colorize_func, "请输入数值，例如 1.5。")
             continue
         if width <= 0:
-            print(colorize_func("宽度需为正数。", "warning"))
+            _warn(colorize_func, "宽度需为正数。")
             continue
         set_line_width_func(width)
         print(colorize_func(f"曲线宽度已更新为 {width}。", "value_positive"))
         break
-
-
+    else:
+        _warn(colorize_func, "多次输入无效，曲线宽度保持不变。")
 
 
 def configure_cli_theme_interactive(
@@ -197,47 +263,54 @@ def configure_cli_theme_interactive(
         prompt_menu_choice_func: 菜单选择函数
         colorize_func: 着色函数
     """
+    # 预先规整 (标题, 说明)，避免每次重绘都构造兜底字典
+    labels = {
+        key: (info.get("label", key), info.get("description"))
+        for key, info in theme_info.items()
+    }
+    # 主题样例只取决于主题键，整个会话内渲染一次即可
+    samples = {key: render_sample_func(key) for key in theme_order}
     while True:
-        current_info = theme_info.get(current_theme, {"label": current_theme})
+        current_label, current_desc = labels.get(current_theme, (current_theme, None))
         header_lines = [
             "",
             colorize_func(
-                f"当前主题: {current_info.get('label', current_theme)} ({current_theme})",
+                f"当前主题: {current_label} ({current_theme})",
                 "menu_text",
             ),
         ]
-        if current_info.get("description"):
-            header_lines.append(colorize_func(f"说明: {current_info['description']}", "menu_hint"))
+        if current_desc:
+            header_lines.append(colorize_func(f"说明: {current_desc}", "menu_hint"))
 
-        options: List[Dict[str, Any]] = []
+        options: List[MenuOption] = []
         default_key = "1"
         for idx, key in enumerate(theme_order, start=1):
-            info = theme_info.get(key, {"label": key})
+            label, desc = labels.get(key, (key, None))
             marker = "✓" if key == current_theme else " "
-            label = info.get("label", key)
-            extra_lines: List[str] = []
-            if info.get("description"):
-                extra_lines.append(colorize_func(f"     {info['description']}", "menu_hint"))
-            extra_lines.append(render_sample_func(key))
-            option = {
-                "key": key,
-                "display": str(idx),
-                "label": f"[{marker}] {label} ({key})",
-                "extra_lines": extra_lines,
-            }
-            options.append(option)
+            if desc:
+                extra_lines = (colorize_func(f"     {desc}", "menu_hint"), samples[key])
+            else:
+                extra_lines = (samples[key],)
+            options.append(
+                MenuOption(
+                    key=key,
+                    label=f"[{marker}] {label} ({key})",
+                    display=_IDX_STR[idx - 1],
+                    extra_lines=extra_lines,
+                )
+            )
             if key == current_theme:
                 default_key = key
-        options.append({"key": "0", "label": "返回上级菜单"})
+        options.append(_BACK_OPTION)
 
         choice = prompt_menu_choice_func(
             options,
-            title="┌─ 终端主题与色彩 ─" + "─" * 18,
+            title=_TITLE_THEME,
             header_lines=header_lines,
-            hint="↑/↓ 选择 · 回车确认 · 数字快捷 · ESC/q 返回",
+            hint=_HINT_COMMON,
             default_key=default_key,
         )
-        if choice in {"0", "__escape__"}:
+        if choice in _ESCAPE_CHOICES:
             return
 
         selected: Optional[str] = None
@@ -249,17 +322,49 @@ def configure_cli_theme_interactive(
                 selected = theme_order[idx - 1]
 
         if not selected:
-            print(colorize_func("输入无效，请重新选择。", "warning"))
+            _warn(colorize_func, "输入无效，请重新选择。")
             continue
         if selected == current_theme:
             print(colorize_func("当前已经是该主题。", "info"))
             continue
         if apply_theme_func(selected):
-            info = theme_info.get(selected, {"label": selected})
-            print(colorize_func(f"已切换到 {info.get('label', selected)} 主题。", "value_positive"))
+            print(colorize_func(f"已切换到 {labels.get(selected, (selected, None))[0]} 主题。", "value_positive"))
 
 
+# 数值输入规则：(解析函数, 校验函数, 无效时的提示, 回显格式)
+_NON_NEGATIVE_INT_INPUT: Final = (int, lambda value: value >= 0, "请输入正整数。", "")
+_FINITE_FLOAT_INPUT: Final = (float, math.isfinite, "请输入数值。", ".2f")
+
+
+def _prompt_number(
+    parser: Callable[[str], Any],
+    is_valid: Callable[[Any], bool],
+    error_text: str,
+    value_format: str,
+    prompt: str,
+    setter: Callable[[Any], Any],
+    current_value: Any,
+    prompt_input_func: Callable,
+    colorize_func: Callable,
+) -> None:
+    """按给定的解析与校验规则读取一个数值并交给 setter。
 
+    空输入或与当前值相同的输入保持不变，不调用 setter（避免无谓的配置落盘）。
+    """
+    raw = prompt_input_func(colorize_func(prompt, "prompt")).strip()
+    if not raw:
+        return
+    try:
+        value = parser(raw)
+    except ValueError:
+        value = None
+    if value is None or not is_valid(value):
+        _warn(colorize_func, error_text)
+        return
+    if abs(value - current_value) < 1e-9:
+        return
+    updated = setter(value)
+    print(colorize_func(f"已更新为 {format(updated, value_format)}", "value_positive"))
 
 
 def configure_signal_thresholds_interactive(
@@ -296,71 +401,36 @@ def configure_signal_thresholds_interactive(
         colorize_func: 着色函数
         prompt_input_func: 输入提示函数
     """
-    print("\n" + colorize_func("┌─ 动量与趋势阈值 ─" + "─" * 16, "divider"))
-    print(colorize_func(
-        f"动量分位回溯天数: {momentum_lookback} · 分位阈值: {momentum_threshold:.2f}",
-        "menu_text",
-    ))
-    print(colorize_func(
-        f"趋势一致条件: ADX>{trend_adx:.1f} · Chop<{trend_chop:.1f} · EMA{trend_fast_span}/EMA{trend_slow_span}",
-        "menu_hint",
-    ))
-
-    def _update_int(prompt: str, setter, current_value: int) -> None:
-        raw_local = prompt_input_func(colorize_func(prompt, "prompt")).strip()
-        if not raw_local:
-            return
-        if not raw_local.isdigit():
-            print(colorize_func("请输入正整数。", "warning"))
-            return
-        value_local = int(raw_local)
-        updated_value = setter(value_local)
-        print(colorize_func(f"已更新为 {updated_value}", "value_positive"))
-
-    def _update_float(prompt: str, setter) -> None:
-        raw_local = prompt_input_func(colorize_func(prompt, "prompt")).strip()
-        if not raw_local:
-            return
-        try:
-            value_local = float(raw_local)
-        except ValueError:
-            print(colorize_func("请输入数值。", "warning"))
-            return
-        updated_value = setter(value_local)
-        print(colorize_func(f"已更新为 {updated_value:.2f}", "value_positive"))
-
-    _update_int(
-        f"动量分位回溯天数（当前 {momentum_lookback}）: ",
-        set_momentum_lookback_func,
-        momentum_lookback,
-    )
-    _update_float(
-        f"动量分位阈值 0-0.99（当前 {momentum_threshold:.2f}）: ",
-        set_momentum_threshold_func,
-    )
-    _update_float(
-        f"Trend ADX 阈值（当前 {trend_adx:.1f}）: ",
-        set_trend_adx_func,
-    )
-    _update_float(
-        f"Trend Chop 阈值（当前 {trend_chop:.1f}）: ",
-        set_trend_chop_func,
-    )
-    _update_int(
-        f"EMA 快线跨度（当前 {trend_fast_span}）: ",
-        set_trend_fast_span_func,
-        trend_fast_span,
+    print(
+        "\n".join(
+            (
+                "",
+                colorize_func(_TITLE_SIGNAL, "divider"),
+                colorize_func(
+                    f"动量分位回溯天数: {momentum_lookback} · 分位阈值: {momentum_threshold:.2f}",
+                    "menu_text",
+                ),
+                colorize_func(
+                    f"趋势一致条件: ADX>{trend_adx:.1f} · Chop<{trend_chop:.1f} · EMA{trend_fast_span}/EMA{trend_slow_span}",
+                    "menu_hint",
+                ),
+            )
+        )
     )
-    _update_int(
-        f"EMA 慢线跨度（当前 {trend_slow_span}）: ",
-        set_trend_slow_span_func,
-        trend_slow_span,
+
+    fields = (
+        (_NON_NEGATIVE_INT_INPUT, f"动量分位回溯天数（当前 {momentum_lookback}）: ", set_momentum_lookback_func, momentum_lookback),
+        (_FINITE_FLOAT_INPUT, f"动量分位阈值 0-0.99（当前 {momentum_threshold:.2f}）: ", set_momentum_threshold_func, momentum_threshold),
+        (_FINITE_FLOAT_INPUT, f"Trend ADX 阈值（当前 {trend_adx:.1f}）: ", set_trend_adx_func, trend_adx),
+        (_FINITE_FLOAT_INPUT, f"Trend Chop 阈值（当前 {trend_chop:.1f}）: ", set_trend_chop_func, trend_chop),
+        (_NON_NEGATIVE_INT_INPUT, f"EMA 快线跨度（当前 {trend_fast_span}）: ", set_trend_fast_span_func, trend_fast_span),
+        (_NON_NEGATIVE_INT_INPUT, f"EMA 慢线跨度（当前 {trend_slow_span}）: ", set_trend_slow_span_func, trend_slow_span),
     )
+    for input_rule, prompt, setter, current_value in fields:
+        _prompt_number(*input_rule, prompt, setter, current_value, prompt_input_func, colorize_func)
     print(colorize_func("阈值设置已更新。后续分析将应用新的判定条件。", "menu_hint"))
 
 
-
-
 def configure_stability_settings_interactive(
     current_method: str,
     current_window: int,
@@ -389,6 +459,8 @@ def configure_stability_settings_interactive(
         colorize_func: 着色函数
         prompt_input_func: 输入提示函数
     """
+    # 本次会话内主题不会变化，循环重绘时相同 (文本, 样式) 直接复用着色结果
+    colorize_func = lru_cache(maxsize=128)(colorize_func)
     while True:
         method_label = (
             "Top-10 存活率"
@@ -406,39 +478,20 @@ def configure_stability_settings_interactive(
                 "menu_hint",
             ),
         ]
-        options = [
-            {"key": "1", "label": "切换稳定度方法"},
-            {"key": "2", "label": "调整稳定度窗口"},
-            {"key": "3", "label": "设置 Top-N 门槛"},
-            {"key": "4", "label": "设置稳定度权重"},
-            {"key": "0", "label": "返回上级菜单"},
-        ]
         choice = prompt_menu_choice_func(
-            options,
-            title="┌─ 稳定度参数设置 ─" + "─" * 14,
+            _STABILITY_OPTIONS,
+            title=_TITLE_STABILITY,
             header_lines=header_lines,
-            hint="↑/↓ 选择 · 回车确认 · 数字快捷 · ESC/q 返回",
+            hint=_HINT_COMMON,
             default_key="0",
         )
-        if choice in {"0", "__escape__"}:
+        if choice in _ESCAPE_CHOICES:
             return
 
         if choice == "1":
-            method_options = [
-                {
-                    "key": "presence_ratio",
-                    "display": "1",
-                    "label": "Top-10 存活率 (presence_ratio)",
-                },
-                {
-                    "key": "kendall",
-                    "display": "2",
-                    "label": "Kendall-τ 排名连贯度 (kendall)",
-                },
-            ]
             selected = prompt_menu_choice_func(
-                method_options,
-                title="┌─ 选择稳定度方法 ─" + "─" * 12,
+                _STABILITY_METHOD_OPTIONS,
+                title=_TITLE_STABILITY_METHOD,
                 header_lines=[""],
                 hint="↑/↓ 选择 · 回车确认",
                 default_key=current_method,
@@ -463,7 +516,7 @@ def configure_stability_settings_interactive(
                     updated = set_window_func(int(raw))
                     print(colorize_func(f"稳定度窗口已更新为 {updated} 日。", "value_positive"))
                 else:
-                    print(colorize_func("请输入正整数。", "warning"))
+                    _warn(colorize_func, "请输入正整数。")
             continue
 
         if choice == "3":
@@ -477,7 +530,7 @@ def configure_stability_settings_interactive(
                     updated = set_top_n_func(int(raw))
                     print(colorize_func(f"Top-N 阈值已更新为 {updated}。", "value_positive"))
                 else:
-                    print(colorize_func("请输入正整数。", "warning"))
+                    _warn(colorize_func, "请输入正整数。")
             continue
 
         if choice == "4":
@@ -490,7 +543,7 @@ def configure_stability_settings_interactive(
                 try:
                     value = float(raw)
                 except ValueError:
-                    print(colorize_func("请输入数值。", "warning"))
+                    _warn(colorize_func, "请输入数值。")
                     continue
                 updated = set_weight_func(value)
                 print(colorize_func(f"稳定度权重已更新为 {updated:.2f}。", "value_positive"))
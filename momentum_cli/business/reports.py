@@ -5,8 +5,18 @@
 
 from __future__ import annotations
 
+import datetime as dt
+import io
+from dataclasses import asdict
 from typing import Any, Dict, List, Optional
 
+import numpy as np
+import pandas as pd
+
+# 排名区块的行数上限：渲染量与券池大小无关，逐行 f-string 即可，
+# 不需要为长列表单独准备 JIT/向量化的格式化路径
+_TEXT_RANKING_ROWS = 10
+
 
 def render_text_report(state: Dict[str, Any]) -> str:
     """渲染文本格式报告
@@ -17,134 +27,52 @@ def render_text_report(state: Dict[str, Any]) -> str:
     Returns:
         文本格式的报告
     """
-    lines = []
+    buf = io.StringIO()
+    w = buf.write
 
     # 标题
-    lines.append("=== 动量分析报告 ===")
-    lines.append("")
+    w("=== 动量分析报告 ===\n\n")
 
     # 基本信息
-    if "start_date" in state and "end_date" in state:
-        lines.append(f"分析区间: {state['start_date']} → {state['end_date']}")
+    get = state.get
+    start_date, end_date = get("start_date"), get("end_date")
+    if start_date is not None and end_date is not None:
+        w(f"分析区间: {start_date} → {end_date}\n")
 
-    if "tickers" in state:
-        ticker_count = len(state["tickers"])
-        lines.append(f"券池规模: {ticker_count}")
+    tickers = get("tickers")
+    if tickers is not None:
+        w(f"券池规模: {len(tickers)}\n")
 
-    if "momentum_windows" in state:
-        windows = state["momentum_windows"]
-        lines.append(f"动量窗口: {', '.join(map(str, windows))}")
+    windows = get("momentum_windows")
+    if windows is not None:
+        w(f"动量窗口: {', '.join(map(str, windows))}\n")
 
-    if "momentum_weights" in state:
-        weights = state["momentum_weights"]
-        weight_str = ", ".join(f"{w:.2f}" for w in weights)
-        lines.append(f"动量权重: {weight_str}")
+    weights = get("momentum_weights")
+    if weights is not None:
+        weight_str = ", ".join(f"{weight:.2f}" for weight in weights)
+        w(f"动量权重: {weight_str}\n")
 
-    lines.append("")
+    w("\n")
 
     # 排名信息
-    if "rankings" in state:
-        lines.append("=== 动量排名 ===")
-        rankings = state["rankings"]
-
-        for i, item in enumerate(rankings[:10], 1):  # 只显示前10
-            ticker = item.get("ticker", "")
-            momentum = item.get("momentum", 0)
-            lines.append(f"{i:2d}. {ticker}: {momentum:.4f}")
-
-        lines.append("")
+    rankings = get("rankings")
+    if rankings is not None:
+        w("=== 动量排名 ===\n")
+        for i, item in enumerate(rankings[:_TEXT_RANKING_ROWS], 1):
+            item_get = item.get
+            w(f"{i:2d}. {item_get('ticker', '')}: {item_get('momentum', 0):.4f}\n")
+        w("\n")
 
     # 警告信息
-    if "warnings" in state and state["warnings"]:
-        lines.append("=== 警告 ===")
-        for warning in state["warnings"]:
-            lines.append(f"  • {warning}")
-        lines.append("")
-
-    return "\n".join(lines)
-
-
-def render_markdown_report(state: Dict[str, Any]) -> str:
-    """渲染Markdown格式报告
-
-    Args:
-        state: 分析状态字典
-
-    Returns:
-        Markdown格式的报告
-    """
-    lines = []
-
-    # 标题
-    lines.append("# 动量分析报告")
-    lines.append("")
+    warnings = get("warnings")
+    if warnings:
+        w("=== 警告 ===\n")
+        for warning in warnings:
+            w(f"  • {warning}\n")
+        w("\n")
 
-    # 基本信息
-    lines.append("## 分析概览")
-    lines.append("")
-
-    if "start_date" in state and "end_date" in state:
-        lines.append(f"- **分析区间**: {state['start_date']} → {state['end_date']}")
-
-    if "tickers" in state:
-        ticker_count = len(state["tickers"])
-        lines.append(f"- **券池规模**: {ticker_count} 只")
-
-    if "momentum_windows" in state:
-        windows = state["momentum_windows"]
-        lines.append(f"- **动量窗口**: {', '.join(map(str, windows))}")
-
-    if "momentum_weights" in state:
-        weights = state["momentum_weights"]
-        weight_str = ", ".join(f"{w:.2f}" for w in weights)
-        lines.append(f"- **动量权重**: {weight_str}")
-
-    lines.append("")
-
-    # 排名表格
-    if "rankings" in state:
-        lines.append("## 动量排名")
-        lines.append("")
-        lines.append("| 排名 | 代码 | 动量值 | 分位数 |")
-        lines.append("|------|------|--------|--------|")
-
-        rankings = state["rankings"]
-        for i, item in enumerate(rankings[:20], 1):  # 显示前20
-            ticker = item.get("ticker", "")
-            momentum = item.get("momentum", 0)
-            percentile = item.get("percentile", 0)
-            lines.append(f"| {i} | {ticker} | {momentum:.4f} | {percentile:.1f}% |")
-
-        lines.append("")
-
-    # 相关性警告
-    if "high_correlation_pairs" in state:
-        pairs = state["high_correlation_pairs"]
-        if pairs:
-            lines.append("## 高相关性警告")
-            lines.append("")
-            for pair in pairs[:10]:  # 显示前10对
-                ticker1 = pair.get("ticker1", "")
-                ticker2 = pair.get("ticker2", "")
-                corr = pair.get("correlation", 0)
-                lines.append(f"- {ticker1} ↔ {ticker2}: {corr:.2f}")
-            lines.append("")
-
-    # 其他警告
-    if "warnings" in state and state["warnings"]:
-        lines.append("## 其他警告")
-        lines.append("")
-        for warning in state["warnings"]:
-            lines.append(f"- {warning}")
-        lines.append("")
-
-    # 生成时间
-    import datetime
-    now = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    lines.append(f"---")
-    lines.append(f"*报告生成时间: {now}*")
-
-    return "\n".join(lines)
+    # 与逐行 join 的结果保持一致：去掉最后一个换行
+    return buf.getvalue()[:-1]
 
 
 def format_summary_table(data: List[Dict[str, Any]], columns: List[str]) -> str:
@@ -160,35 +88,20 @@ def format_summary_table(data: List[Dict[str, Any]], columns: List[str]) -> str:
     if not data or not columns:
         return ""
 
-    lines = []
-
-    # 计算列宽
-    col_widths = {}
-    for col in columns:
-        col_widths[col] = len(col)
-
-    for row in data:
-        for col in columns:
-            value = str(row.get(col, ""))
-            col_widths[col] = max(col_widths[col], len(value))
-
-    # 表头
-    header = " | ".join(col.ljust(col_widths[col]) for col in columns)
-    lines.append(header)
-
-    # 分隔线
-    separator = "-+-".join("-" * col_widths[col] for col in columns)
-    lines.append(separator)
-
-    # 数据行
-    for row in data:
-        row_str = " | ".join(
-            str(row.get(col, "")).ljust(col_widths[col])
-            for col in columns
-        )
-        lines.append(row_str)
-
-    return "\n".join(lines)
+    # 每个单元格只做一次 str() 转换，列宽与数据行共用
+    rows_str = [[str(row.get(col, "")) for col in columns] for row in data]
+    widths = [
+        max(len(col), max((len(cells[i]) for cells in rows_str), default=0))
+        for i, col in enumerate(columns)
+    ]
+
+    header_line = " | ".join(f"{col:<{width}}" for col, width in zip(columns, widths))
+    separator = "-+-".join("-" * width for width in widths)
+    body = "\n".join(
+        " | ".join(f"{cell:<{width}}" for cell, width in zip(cells, widths))
+        for cells in rows_str
+    )
+    return f"{header_line}\n{separator}\n{body}"
 
 
 def generate_quick_summary(state: Dict[str, Any]) -> str:
@@ -201,17 +114,19 @@ def generate_quick_summary(state: Dict[str, Any]) -> str:
         快速摘要字符串
     """
     parts = []
+    get = state.get
 
-    if "tickers" in state:
-        parts.append(f"{len(state['tickers'])}只ETF")
+    tickers = get("tickers")
+    if tickers is not None:
+        parts.append(f"{len(tickers)}只ETF")
 
-    if "start_date" in state and "end_date" in state:
-        parts.append(f"{state['start_date']}至{state['end_date']}")
+    start_date, end_date = get("start_date"), get("end_date")
+    if start_date is not None and end_date is not None:
+        parts.append(f"{start_date}至{end_date}")
 
-    if "rankings" in state and state["rankings"]:
-        top = state["rankings"][0]
-        ticker = top.get("ticker", "")
-        parts.append(f"榜首: {ticker}")
+    rankings = get("rankings")
+    if rankings:
+        parts.append(f"榜首: {rankings[0].get('ticker', '')}")
 
     return " · ".join(parts) if parts else "无数据"
 
@@ -253,14 +168,54 @@ def display_analysis_summary(state: dict, format_summary_func, format_correlatio
         )
     )
 
-    if result.plot_paths:
+    # 载荷里已有字符串化的图表路径，直接复用
+    payload_meta = (state.get("payload") or {}).get("meta") or {}
+    plot_paths = payload_meta.get("plot_paths")
+    if plot_paths is None:
+        plot_paths = [str(path) for path in (result.plot_paths or ())]
+    if plot_paths:
         print(colorize_func("生成的图表：", "heading"))
-        for path in result.plot_paths:
+        for path in plot_paths:
             print(colorize_func(f" - {path}", "menu_hint"))
 
 
 
 
+# 策略门控文案（按语言预先建表）
+_GATE_LABELS = {
+    "zh": {
+        "crash": "市场大跌",
+        "down": "市场下跌",
+        "rally": "市场大涨",
+        "up": "市场上涨",
+        "top_weak": "榜首动量弱",
+        "top_strong": "榜首动量强",
+        "trend_weak": "榜首趋势弱",
+        "trend_strong": "榜首趋势强",
+    },
+    "en": {
+        "crash": "Market Crash",
+        "down": "Market Down",
+        "rally": "Market Rally",
+        "up": "Market Up",
+        "top_weak": "Top Weak",
+        "top_strong": "Top Strong",
+        "trend_weak": "Top Trend Weak",
+        "trend_strong": "Top Trend Strong",
+    },
+}
+
+
+def _to_float(value) -> Optional[float]:
+    """尽量转为 float，None 或无法转换时返回 None"""
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
 def build_strategy_gate_entries(result, lang: str, format_label_func=None) -> list:
     """构建策略门控条目
 
@@ -272,16 +227,18 @@ def build_strategy_gate_entries(result, lang: str, format_label_func=None) -> li
     Returns:
         门控条目列表 [(text, style), ...]
     """
-    import pandas as pd
-    from typing import Optional
-
     entries: list = []
     market = getattr(result, "market_snapshot", None)
-    is_zh = lang == "zh"
+    labels = _GATE_LABELS["zh" if lang == "zh" else "en"]
 
-    summary_sorted = pd.DataFrame()
-    if isinstance(getattr(result, "summary", None), pd.DataFrame) and not result.summary.empty:
-        summary_sorted = result.summary.sort_values("momentum_score", ascending=False)
+    # 只需要榜首一行：线性扫描取最大动量，而不是整表排序
+    top_row = None
+    summary = getattr(result, "summary", None)
+    if isinstance(summary, pd.DataFrame) and not summary.empty and "momentum_score" in summary.columns:
+        scores = pd.to_numeric(summary["momentum_score"], errors="coerce").to_numpy(dtype=float)
+        # 全为 NaN 时与降序排序一致，取第一行
+        top_pos = 0 if np.isnan(scores).all() else int(np.nanargmax(scores))
+        top_row = summary.iloc[top_pos]
 
     top_label: Optional[str] = None
     top_score: Optional[float] = None
@@ -289,34 +246,18 @@ def build_strategy_gate_entries(result, lang: str, format_label_func=None) -> li
     top_adx: Optional[float] = None
     top_adx_state: Optional[str] = None
 
-    if not summary_sorted.empty:
-        top_row = summary_sorted.iloc[0]
+    if top_row is not None:
         top_code = top_row.get("etf")
         if isinstance(top_code, str):
             if format_label_func:
                 top_label = format_label_func(top_code)
             else:
                 top_label = top_code
-        try:
-            top_score = float(top_row.get("momentum_score"))
-        except (TypeError, ValueError):
-            top_score = None
-        try:
-            top_percentile = float(top_row.get("momentum_percentile"))
-        except (TypeError, ValueError):
-            top_percentile = None
-        try:
-            top_adx = float(top_row.get("adx"))
-        except (TypeError, ValueError):
-            top_adx = None
+        top_score = _to_float(top_row.get("momentum_score"))
+        top_percentile = _to_float(top_row.get("momentum_percentile"))
+        top_adx = _to_float(top_row.get("adx"))
         top_adx_state = top_row.get("adx_state")
 
-    def _to_float(value) -> Optional[float]:
-        try:
-            return float(value) if value is not None else None
-        except (TypeError, ValueError):
-            return None
-
     # 市场快照门控
     if market:
         hs300_chg = _to_float(market.get("hs300_change"))
@@ -326,33 +267,81 @@ def build_strategy_gate_entries(result, lang: str, format_label_func=None) -> li
         if hs300_chg is not None and zz500_chg is not None and zz1000_chg is not None:
             avg_chg = (hs300_chg + zz500_chg + zz1000_chg) / 3.0
             if avg_chg < -0.5:
-                entries.append(("市场大跌" if is_zh else "Market Crash", "danger"))
+                entries.append((labels["crash"], "danger"))
             elif avg_chg < -0.2:
-                entries.append(("市场下跌" if is_zh else "Market Down", "warning"))
+                entries.append((labels["down"], "warning"))
             elif avg_chg > 1.0:
-                entries.append(("市场大涨" if is_zh else "Market Rally", "success"))
+                entries.append((labels["rally"], "success"))
             elif avg_chg > 0.3:
-                entries.append(("市场上涨" if is_zh else "Market Up", "info"))
+                entries.append((labels["up"], "info"))
 
     # 榜首动量门控（使用分位数判断）
     if top_percentile is not None:
         if top_percentile < 50:
-            entries.append(("榜首动量弱" if is_zh else "Top Weak", "warning"))
+            entries.append((labels["top_weak"], "warning"))
         elif top_percentile >= 70:
-            entries.append(("榜首动量强" if is_zh else "Top Strong", "success"))
+            entries.append((labels["top_strong"], "success"))
 
     # ADX 门控
     if top_adx is not None:
         if top_adx < 20:
-            entries.append(("榜首趋势弱" if is_zh else "Top Trend Weak", "warning"))
+            entries.append((labels["trend_weak"], "warning"))
         elif top_adx > 40:
-            entries.append(("榜首趋势强" if is_zh else "Top Trend Strong", "success"))
+            entries.append((labels["trend_strong"], "success"))
 
     return entries
 
 
 
 
+def _frame_to_json_obj(df, orient: str = "records"):
+    """DataFrame → 可直接 json.dumps 的 Python 对象（替代 json.loads(df.to_json(...))）
+
+    ``to_dict`` 已把取值装箱为 Python 原生类型；这里仅按列定位缺失值，
+    把 NaN/±inf/NaT 改写为 None，与 ``to_json`` 输出 null 的约定一致。
+    """
+    data = df.to_dict(orient=orient)
+    columns = df.columns.tolist()
+    index = df.index
+    for position, dtype in enumerate(df.dtypes):
+        if dtype.kind in "biu":
+            continue
+        values = df.iloc[:, position]
+        if dtype.kind == "f":
+            invalid = ~np.isfinite(values.to_numpy())
+        else:
+            invalid = values.isna().to_numpy()
+        rows = np.flatnonzero(invalid)
+        if not rows.size:
+            continue
+        key = columns[position]
+        if orient == "records":
+            for row in rows:
+                data[row][key] = None
+        else:
+            column_data = data[key]
+            for row in rows:
+                column_data[index[row]] = None
+    return data
+
+
+def _prep_series(series_df, max_rows: int):
+    """截取最近 max_rows 行并把索引展开为字符串 date 列
+
+    短序列不再经过 tail；reset_index 本身返回新对象，调用方无需预先 copy。
+    """
+    if series_df.empty:
+        series_df = series_df.copy()
+        series_df["date"] = []
+        return series_df
+    if len(series_df) > max_rows:
+        series_df = series_df.tail(max_rows)
+    series_df = series_df.reset_index()
+    series_df.rename(columns={series_df.columns[0]: "date"}, inplace=True)
+    series_df["date"] = series_df["date"].astype(str)
+    return series_df
+
+
 def build_result_payload(
     result,
     config,
@@ -364,35 +353,26 @@ def build_result_payload(
     max_series_export: int = 252,
 ) -> dict:
     """构建结果载荷"""
-    import json
-    import datetime as dt
-    from dataclasses import asdict
 
-    # 摘要
-    summary_df = result.summary.copy()
+    # 摘要：交易日通常全表相同，按去重值格式化后再映射回各行；assign 只在此处复制
+    summary_df = result.summary
     if "trade_date" in summary_df.columns:
-        summary_df["trade_date"] = summary_df["trade_date"].apply(
-            lambda v: v.isoformat() if hasattr(v, "isoformat") else str(v)
+        codes, uniques = pd.factorize(summary_df["trade_date"], use_na_sentinel=False)
+        formatted = np.array(
+            [v.isoformat() if hasattr(v, "isoformat") else str(v) for v in uniques],
+            dtype=object,
         )
-    summary_json = json.loads(summary_df.to_json(orient="records", force_ascii=False))
+        summary_df = summary_df.assign(trade_date=formatted[codes])
+    summary_json = _frame_to_json_obj(summary_df)
 
     # 相关矩阵
     correlation_df = result.correlation.round(4)
-    correlation_json = json.loads(correlation_df.to_json(force_ascii=False))
+    correlation_json = _frame_to_json_obj(correlation_df, orient="dict")
 
     # 动量/排名/稳定度序列
-    def _series_to_json(series_df):
-        if not series_df.empty:
-            series_df = series_df.tail(max_series_export).reset_index()
-            series_df.rename(columns={series_df.columns[0]: "date"}, inplace=True)
-            series_df["date"] = series_df["date"].astype(str)
-        else:
-            series_df["date"] = []
-        return json.loads(series_df.to_json(orient="records", force_ascii=False))
-
-    momentum_json = _series_to_json(result.momentum_scores.copy())
-    rank_json = _series_to_json(result.rank_history.copy())
-    stability_json = _series_to_json(result.stability_scores.copy())
+    momentum_json = _frame_to_json_obj(_prep_series(result.momentum_scores, max_series_export))
+    rank_json = _frame_to_json_obj(_prep_series(result.rank_history, max_series_export))
+    stability_json = _frame_to_json_obj(_prep_series(result.stability_scores, max_series_export))
 
     # 元数据
     meta: dict = {
@@ -477,90 +457,91 @@ def render_markdown_report(
     collect_alerts_func,
     correlation_threshold: float,
 ) -> str:
-    lines: list[str] = []
-    title = "# 动量分析报告" if lang == "zh" else "# Momentum Analysis Report"
-    lines.append(title)
+    buf = io.StringIO()
+    w = buf.write
+    zh = lang == "zh"
+    w("# 动量分析报告\n" if zh else "# Momentum Analysis Report\n")
 
     alerts = collect_alerts_func(result)
 
-    start_text = config.start_date or ("最早可用" if lang == "zh" else "Earliest")
-    end_text = config.end_date or ("最新交易日" if lang == "zh" else "Latest available")
-    lines.append("")
-    if lang == "zh":
-        lines.append(f"- 分析区间：{start_text} → {end_text}")
-        lines.append(f"- 券池数量：{len(result.summary)}")
-        lines.append(f"- 动量窗口：{', '.join(str(w) for w in momentum_config.windows)}")
-        if momentum_config.weights:
-            lines.append(f"- 动量权重：{', '.join(f'{w:.2f}' for w in momentum_config.weights)}")
-        lines.append(
-            f"- 参数：Corr {config.corr_window} / Chop {config.chop_window} / 趋势 {config.trend_window} / 回溯 {config.rank_change_lookback}"
+    start_text = config.start_date or ("最早可用" if zh else "Earliest")
+    end_text = config.end_date or ("最新交易日" if zh else "Latest available")
+    window_text = ", ".join(str(win) for win in momentum_config.windows)
+    weight_text = (
+        ", ".join(f"{weight:.2f}" for weight in momentum_config.weights)
+        if momentum_config.weights
+        else None
+    )
+    w("\n")
+    if zh:
+        w(f"- 分析区间：{start_text} → {end_text}\n")
+        w(f"- 券池数量：{len(result.summary)}\n")
+        w(f"- 动量窗口：{window_text}\n")
+        if weight_text is not None:
+            w(f"- 动量权重：{weight_text}\n")
+        w(
+            f"- 参数：Corr {config.corr_window} / Chop {config.chop_window} / 趋势 {config.trend_window} / 回溯 {config.rank_change_lookback}\n"
         )
         if preset:
-            lines.append(f"- 分析预设：{preset.name} [{preset.key}] - {preset.description}")
+            w(f"- 分析预设：{preset.name} [{preset.key}] - {preset.description}\n")
     else:
-        lines.append(f"- Range: {start_text} → {end_text}")
-        lines.append(f"- Universe size: {len(result.summary)} ETFs")
-        lines.append(f"- Momentum windows: {', '.join(str(w) for w in momentum_config.windows)}")
-        if momentum_config.weights:
-            lines.append(f"- Momentum weights: {', '.join(f'{w:.2f}' for w in momentum_config.weights)}")
-        lines.append(
-            f"- Parameters: Corr {config.corr_window} / Chop {config.chop_window} / Trend {config.trend_window} / Rank lookback {config.rank_change_lookback}"
+        w(f"- Range: {start_text} → {end_text}\n")
+        w(f"- Universe size: {len(result.summary)} ETFs\n")
+        w(f"- Momentum windows: {window_text}\n")
+        if weight_text is not None:
+            w(f"- Momentum weights: {weight_text}\n")
+        w(
+            f"- Parameters: Corr {config.corr_window} / Chop {config.chop_window} / Trend {config.trend_window} / Rank lookback {config.rank_change_lookback}\n"
         )
         if preset:
-            lines.append(f"- Preset: {preset.name} [{preset.key}] - {preset.description}")
+            w(f"- Preset: {preset.name} [{preset.key}] - {preset.description}\n")
 
     gate_entries = build_gate_entries_func(result, lang)
     if gate_entries:
         icon_map = {"warning": "⚠️ ", "menu_hint": "ℹ️ ", "menu_text": ""}
-        lines.append("")
-        lines.append("## 策略闸口" if lang == "zh" else "## Strategy Gates")
+        w("\n## 策略闸口\n" if zh else "\n## Strategy Gates\n")
         for text, style in gate_entries:
-            prefix = icon_map.get(style, "")
-            lines.append(f"- {prefix}{text}")
-
-    lines.append("")
-    lines.append("## Summary")
-    lines.append(summary_to_md_func(result.summary, lang))
-    lines.append("")
-    lines.append("## Correlation")
-    lines.append(correlation_to_md_func(result.correlation.round(2), lang))
-    lines.append("")
-
-    if alerts.get("momentum_rank_drops") or alerts.get("high_correlation_pairs"):
-        lines.append("## 预警提示" if lang == "zh" else "## Alerts")
-        if alerts.get("momentum_rank_drops"):
-            if lang == "zh":
-                lines.append("- 动量排名连续走弱：")
-                for item in alerts["momentum_rank_drops"]:
-                    lines.append(
-                        f"  - {item['label']}：{item['start_rank']} → {item['end_rank']}，连续 {item['weeks']} 周下滑"
-                    )
+            w(f"- {icon_map.get(style, '')}{text}\n")
+
+    w("\n## Summary\n")
+    w(summary_to_md_func(result.summary, lang))
+    w("\n\n## Correlation\n")
+    w(correlation_to_md_func(result.correlation.round(2), lang))
+    w("\n\n")
+
+    rank_drops = alerts.get("momentum_rank_drops")
+    corr_pairs = alerts.get("high_correlation_pairs")
+    if rank_drops or corr_pairs:
+        w("## 预警提示\n" if zh else "## Alerts\n")
+        if rank_drops:
+            if zh:
+                w("- 动量排名连续走弱：\n")
+                for item in rank_drops:
+                    w(f"  - {item['label']}：{item['start_rank']} → {item['end_rank']}，连续 {item['weeks']} 周下滑\n")
             else:
-                lines.append("- Momentum ranks weakening:")
-                for item in alerts["momentum_rank_drops"]:
-                    lines.append(
-                        f"  - {item['label']} : {item['start_rank']} → {item['end_rank']} over {item['weeks']} consecutive weeks"
+                w("- Momentum ranks weakening:\n")
+                for item in rank_drops:
+                    w(
+                        f"  - {item['label']} : {item['start_rank']} → {item['end_rank']} over {item['weeks']} consecutive weeks\n"
                     )
-        if alerts.get("high_correlation_pairs"):
+        if corr_pairs:
             threshold_text = f"{correlation_threshold:.2f}"
-            if lang == "zh":
-                lines.append(f"- 高相关性（ρ ≥ {threshold_text}）：")
-                for item in alerts["high_correlation_pairs"]:
-                    lines.append(f"  - {item['label_a']} ↔ {item['label_b']} : {item['value']:.2f}")
+            if zh:
+                w(f"- 高相关性（ρ ≥ {threshold_text}）：\n")
             else:
-                lines.append(f"- High correlations (ρ ≥ {threshold_text}):")
-                for item in alerts["high_correlation_pairs"]:
-                    lines.append(f"  - {item['label_a']} ↔ {item['label_b']} : {item['value']:.2f}")
-        lines.append("")
+                w(f"- High correlations (ρ ≥ {threshold_text}):\n")
+            for item in corr_pairs:
+                w(f"  - {item['label_a']} ↔ {item['label_b']} : {item['value']:.2f}\n")
+        w("\n")
 
-    if lang == "zh":
-        lines.append(f"运行耗时：{result.runtime_seconds:.2f} 秒")
+    if zh:
+        w(f"运行耗时：{result.runtime_seconds:.2f} 秒\n")
     else:
-        lines.append(f"Runtime: {result.runtime_seconds:.2f} seconds")
+        w(f"Runtime: {result.runtime_seconds:.2f} seconds\n")
     if result.plot_paths:
-        lines.append("")
-        lines.append("## 图表 / Plots")
+        w("\n## 图表 / Plots\n")
         for path in result.plot_paths:
-            lines.append(f"- {path}")
+            w(f"- {path}\n")
 
-    return "\n".join(lines).strip()
+    # 与逐行 join 后 strip 的结果一致：末尾换行一并去掉
+    return buf.getvalue().strip()
@@ -5,13 +5,42 @@
 
 from __future__ import annotations
 
+import copy
+import hashlib
 import json
+import os
+import tempfile
 import textwrap
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, Optional
+from types import MappingProxyType
+from typing import Dict, Mapping, Optional
 
 from ..utils.colors import colorize
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover - 可选依赖
+    orjson = None
+
+
+def _dumps_store(payload: dict) -> bytes:
+    """序列化模板存储；orjson 可用时直接产出 bytes，省去一次编码"""
+    if orjson is not None:
+        return orjson.dumps(
+            payload,
+            option=orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS,
+        )
+    return json.dumps(payload, ensure_ascii=False, indent=2, sort_keys=True).encode("utf-8")
+
+
+def _loads_store(data):
+    """解析模板存储，接受 bytes 或 str"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
 # 模板存储路径
 TEMPLATE_STORE_PATH = Path(__file__).resolve().parent.parent / "templates.json"
 
@@ -54,13 +83,10 @@ def build_builtin_template(
     return template
 
 
-def get_builtin_template_store() -> Dict[str, dict]:
-    """获取内置模板存储
-
-    Returns:
-        内置模板字典
-    """
-    return {
+@lru_cache(maxsize=1)
+def _builtin_template_store() -> Mapping[str, dict]:
+    """内置模板（进程内只构建一次，以只读映射共享）"""
+    return MappingProxyType({
         "default": build_builtin_template(
             name="默认配置",
             description="3个月 + 6个月动量，等权重",
@@ -81,26 +107,62 @@ def get_builtin_template_store() -> Dict[str, dict]:
             trend_window=90,
             lookback_days=5,
         ),
-    }
+    })
 
 
-def load_template_store() -> Dict[str, dict]:
-    """加载模板存储
+def _template_fingerprint(template: dict) -> str:
+    return json.dumps(template, sort_keys=True, ensure_ascii=False)
+
+
+@lru_cache(maxsize=1)
+def _builtin_fingerprints() -> Dict[str, str]:
+    """内置模板的规范化 JSON 指纹，写入时用于判断条目是否与内置一致"""
+    return {key: _template_fingerprint(value) for key, value in _builtin_template_store().items()}
+
+
+def get_builtin_template_store() -> Dict[str, dict]:
+    """获取内置模板存储
 
     Returns:
-        模板字典
+        内置模板字典
     """
-    base_store = get_builtin_template_store()
+    # 内置模板在进程内共享，深复制后调用方的修改不会影响后续读取与写入比较
+    return copy.deepcopy(dict(_builtin_template_store()))
 
-    if not TEMPLATE_STORE_PATH.exists():
-        return dict(base_store)
 
+def _template_store_signature() -> Optional[tuple]:
+    """模板文件的缓存键（路径 + mtime + 大小），文件不存在时返回 None"""
     try:
-        data = json.loads(TEMPLATE_STORE_PATH.read_text(encoding="utf-8"))
-    except (OSError, json.JSONDecodeError):
-        return dict(base_store)
+        stat = TEMPLATE_STORE_PATH.stat()
+    except OSError:
+        return None
+    return (str(TEMPLATE_STORE_PATH), stat.st_mtime_ns, stat.st_size)
+
+
+def _store_digest(raw: bytes) -> bytes:
+    return hashlib.blake2b(raw, digest_size=16).digest()
+
+
+def _read_template_store(signature: Optional[tuple]) -> tuple:
+    """读取模板文件，返回 (模板字典, 文件内容摘要)；无法读取时摘要为 None"""
+    base_store = _builtin_template_store()
+
+    if signature is None:
+        return dict(base_store), None
+
+    try:
+        raw = TEMPLATE_STORE_PATH.read_bytes()
+        # json.loads 同样接受 bytes，由 C 层一次完成 UTF-8 解码
+        data = _loads_store(raw)
+    except (OSError, UnicodeDecodeError, json.JSONDecodeError):  # orjson.JSONDecodeError 是其子类
+        return dict(base_store), None
+
+    return _merge_templates(data.get("templates")), _store_digest(raw)
 
-    templates = data.get("templates")
+
+def _merge_templates(templates) -> Dict[str, dict]:
+    """把落盘的覆盖项（None 表示删除内置模板）合并到内置模板之上"""
+    base_store = _builtin_template_store()
     if not isinstance(templates, dict):
         return dict(base_store)
 
@@ -116,40 +178,138 @@ def load_template_store() -> Dict[str, dict]:
     return store
 
 
+# (签名, 模板字典, 文件内容摘要)；文件未变化时直接复用，避免重复读取和解析 JSON，
+# 摘要用于写入时识别内容未变的存储
+_STORE_CACHE: Optional[tuple] = None
+
+
+def load_template_store() -> Dict[str, dict]:
+    """加载模板存储
+
+    Returns:
+        模板字典
+    """
+    # 深复制：模板内的 etfs、momentum_windows 等列表也不与缓存共享，调用方可随意修改
+    return copy.deepcopy(_cached_template_store())
+
+
+def load_template_store_readonly() -> Mapping[str, dict]:
+    """加载模板存储的只读视图
+
+    直接共享缓存，不逐个复制模板；仅供列表、打印等只读场景使用，
+    需要修改时请使用 load_template_store。
+
+    Returns:
+        只读模板映射
+    """
+    return MappingProxyType(_cached_template_store())
+
+
+def _cached_template_store() -> Dict[str, dict]:
+    """返回缓存中的模板字典（只读共享，调用方不得修改）"""
+    global _STORE_CACHE
+    signature = _template_store_signature()
+    cached = _STORE_CACHE
+    if cached is None or cached[0] != signature:
+        cached = (signature, *_read_template_store(signature))
+        _STORE_CACHE = cached
+    return cached[1]
+
+
 def write_template_store(store: Dict[str, dict]) -> None:
     """写入模板存储
 
     Args:
         store: 模板字典
     """
-    base_store = get_builtin_template_store()
+    global _STORE_CACHE
+    previous = _STORE_CACHE
+    _STORE_CACHE = None
+    base_store = _builtin_template_store()
+    fingerprints = _builtin_fingerprints()
     payload_templates: Dict[str, Optional[dict]] = {}
 
     for key, value in store.items():
-        base_value = base_store.get(key)
         if value is None:
             payload_templates[key] = None
             continue
         if not isinstance(value, dict):
             continue
-        if base_value is not None and base_value == value:
+        # 与内置模板完全一致的条目无需落盘；键集合不同时不必再序列化比较
+        base_value = base_store.get(key)
+        if (
+            base_value is not None
+            and value.keys() == base_value.keys()
+            and _template_fingerprint(value) == fingerprints[key]
+        ):
             continue
         payload_templates[key] = value
 
-    TEMPLATE_STORE_PATH.parent.mkdir(parents=True, exist_ok=True)
-
     if not payload_templates:
         try:
             TEMPLATE_STORE_PATH.unlink()
         except OSError:
             pass
+        else:
+            _STORE_CACHE = (None, dict(base_store), None)
         return
 
     payload = {"templates": payload_templates}
-    TEMPLATE_STORE_PATH.write_text(
-        json.dumps(payload, ensure_ascii=False, indent=2, sort_keys=True),
-        encoding="utf-8",
-    )
+    data = _dumps_store(payload)
+    digest = _store_digest(data)
+
+    # 内容与上次读写的文件一致且文件未被外部改动时，跳过写入和 fsync
+    if previous is not None and previous[2] == digest:
+        if _template_store_signature() == previous[0]:
+            _STORE_CACHE = previous
+            return
+
+    _atomic_write_bytes(TEMPLATE_STORE_PATH, data)
+
+    # 写完直接用内存中的字节刷新缓存，下一次加载无需再读文件；
+    # 仍经过一次 loads，保证与从磁盘读取的结果完全一致
+    signature = _template_store_signature()
+    if signature is not None:
+        parsed = _loads_store(data)
+        _STORE_CACHE = (signature, _merge_templates(parsed["templates"]), digest)
+
+
+def _atomic_write_bytes(path: Path, data: bytes) -> None:
+    """先写同目录临时文件再 os.replace，避免中途失败留下残缺的模板文件"""
+    directory = path.parent
+    try:
+        fd, tmp_name = tempfile.mkstemp(dir=directory, prefix=f".{path.stem}.", suffix=".tmp")
+    except FileNotFoundError:
+        # 目录不存在时才创建，常见路径省去一次 mkdir
+        directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=directory, prefix=f".{path.stem}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            # mkstemp 固定以 0600 创建，替换前恢复为目标文件应有的权限
+            if hasattr(os, "fchmod"):
+                os.fchmod(handle.fileno(), _target_file_mode(path))
+            # 整块 bytes 超过缓冲区时 BufferedWriter 会直接下发，无需再调大 buffering
+            handle.write(data)
+            handle.flush()
+            # 落盘后再替换，断电时不会把尚未写入的空文件换上去
+            os.fsync(handle.fileno())
+        os.replace(tmp_name, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except OSError:
+            pass
+        raise
+
+
+def _target_file_mode(path: Path) -> int:
+    """沿用已有文件的权限；新文件按 umask 计算，与直接 open 写入时一致"""
+    try:
+        return os.stat(path).st_mode & 0o777
+    except FileNotFoundError:
+        mask = os.umask(0)
+        os.umask(mask)
+        return 0o666 & ~mask
 
 
 def get_template(name: str) -> Optional[dict]:
@@ -161,7 +321,9 @@ def get_template(name: str) -> Optional[dict]:
     Returns:
         模板字典，如果不存在返回None
     """
-    return load_template_store().get(name)
+    # 只深复制命中的那一个模板；仍需 stat 一次，用户文件可能覆盖同名内置模板
+    value = _cached_template_store().get(name)
+    return copy.deepcopy(value) if value is not None else None
 
 
 def save_template(name: str, payload: dict, overwrite: bool = False) -> bool:
@@ -196,7 +358,7 @@ def delete_template(name: str) -> bool:
         是否成功删除
     """
     store = load_template_store()
-    base_store = get_builtin_template_store()
+    base_store = _builtin_template_store()
 
     existed = name in store or name in base_store
     if not existed:
@@ -221,6 +383,14 @@ def list_templates() -> Dict[str, dict]:
     return load_template_store()
 
 
+# 模板中可直接转为运行参数的键：基本参数 + 可选参数
+_TEMPLATE_PARAM_KEYS = frozenset({
+    "preset_keys", "momentum_windows", "momentum_weights",
+    "start", "end", "correlation_threshold", "momentum_threshold",
+    "stability_weight", "chop_window", "trend_window", "lookback_days",
+})
+
+
 def template_to_params(template: dict) -> dict:
     """将模板转换为参数字典
 
@@ -230,27 +400,7 @@ def template_to_params(template: dict) -> dict:
     Returns:
         参数字典
     """
-    params = {}
-
-    # 基本参数
-    if "preset_keys" in template:
-        params["preset_keys"] = template["preset_keys"]
-    if "momentum_windows" in template:
-        params["momentum_windows"] = template["momentum_windows"]
-    if "momentum_weights" in template:
-        params["momentum_weights"] = template["momentum_weights"]
-
-    # 可选参数
-    optional_keys = [
-        "start", "end", "correlation_threshold", "momentum_threshold",
-        "stability_weight", "chop_window", "trend_window", "lookback_days"
-    ]
-
-    for key in optional_keys:
-        if key in template:
-            params[key] = template[key]
-
-    return params
+    return {key: value for key, value in template.items() if key in _TEMPLATE_PARAM_KEYS}
 
 
 
@@ -273,29 +423,11 @@ def print_template_details(name: str, payload: dict, format_label_func=None) ->
     presets = payload.get("presets") or []
     codes = payload.get("etfs") or []
 
-    print(colorize(f"模板：{name}", "heading"))
-    print(colorize(f"  区间: {start} → {end}", "menu_text"))
-
-    window_text = ",".join(str(int(win)) for win in windows) if windows else "-"
-    weight_text = (
-        ",".join(f"{float(weight):.2f}" for weight in weights)
-        if weights
-        else "等权"
-    )
+    window_text = ",".join(map(str, map(int, windows))) if windows else "-"
+    weight_text = ",".join(map("{:.2f}".format, map(float, weights))) if weights else "等权"
     skip_values = payload.get("momentum_skip_windows") or []
-    skip_text = ",".join(str(int(value)) for value in skip_values) if skip_values else "0"
-    print(colorize(f"  动量窗口: {window_text} | 剔除: {skip_text} | 权重: {weight_text}", "menu_text"))
-
-    print(
-        colorize(
-            "  参数: "
-            + f"Corr {corr_window} / Chop {chop_window} / 趋势 {trend_window} / 回溯 {rank_lookback}",
-            "menu_hint",
-        )
-    )
-
+    skip_text = ",".join(map(str, map(int, skip_values))) if skip_values else "0"
     preset_text = ",".join(presets) if presets else "无标签"
-    print(colorize(f"  预设标签: {preset_text}", "menu_hint"))
 
     # 格式化代码列表
     if format_label_func:
@@ -309,7 +441,24 @@ def print_template_details(name: str, payload: dict, format_label_func=None) ->
         initial_indent="  券池: ",
         subsequent_indent="         ",
     )
-    print(colorize(wrapped_codes, "menu_hint"))
+
+    # 各行先着色再一次性输出
+    print(
+        "\n".join(
+            (
+                colorize(f"模板：{name}", "heading"),
+                colorize(f"  区间: {start} → {end}", "menu_text"),
+                colorize(f"  动量窗口: {window_text} | 剔除: {skip_text} | 权重: {weight_text}", "menu_text"),
+                colorize(
+                    "  参数: "
+                    + f"Corr {corr_window} / Chop {chop_window} / 趋势 {trend_window} / 回溯 {rank_lookback}",
+                    "menu_hint",
+                ),
+                colorize(f"  预设标签: {preset_text}", "menu_hint"),
+                colorize(wrapped_codes, "menu_hint"),
+            )
+        )
+    )
 
 
 def print_template_list(templates: dict) -> None:
@@ -322,13 +471,11 @@ def print_template_list(templates: dict) -> None:
         print(colorize("暂无已保存的模板。", "warning"))
         return
 
-    print(colorize("已保存的模板:", "heading"))
-    for name in sorted(templates.keys()):
+    lines = [colorize("已保存的模板:", "heading")]
+    for name in sorted(templates):
         desc = templates[name].get("description", "")
-        if desc:
-            print(colorize(f"  • {name}: {desc}", "menu_text"))
-        else:
-            print(colorize(f"  • {name}", "menu_text"))
+        lines.append(colorize(f"  • {name}: {desc}" if desc else f"  • {name}", "menu_text"))
+    print("\n".join(lines))
 
 
 
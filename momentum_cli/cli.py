@@ -9,6 +9,7 @@ import json
 import os
 import re
 import select
+import signal
 import subprocess
 import sys
 import shutil
@@ -130,7 +131,8 @@ from .utils.debug import log_key_event as _log_key_event, log_key_result as _log
 # 为了兼容性，从utils.colors导入
 from .utils.colors import CLI_THEMES as _CLI_THEMES
 
-_TERMINAL_SIZE_CACHE = {"columns": 120, "timestamp": 0.0}
+# ttl：未能监听 SIGWINCH 时按 1 秒轮询；监听成功后尺寸变化会主动让缓存失效，可放宽到 5 秒
+_TERMINAL_SIZE_CACHE = {"columns": 120, "timestamp": 0.0, "ttl": 1.0, "resize_hooked": False}
 
 _MOMENTUM_ALERT_TOP = 6
 _MOMENTUM_ALERT_WEEKS = 3
@@ -174,72 +176,41 @@ except (TypeError, ValueError):
 # _validate_* 函数已移至 config.validators
 
 
-_CORRELATION_ALERT_THRESHOLD = _validate_corr_threshold(
-    _SETTINGS.get("correlation_alert_threshold"), _DEFAULT_SETTINGS["correlation_alert_threshold"]
+# (配置键, 校验函数, 额外参数)；逐项校验，不合法时回写默认/截断后的值
+_SETTINGS_SCHEMA: Tuple[Tuple[str, Any, Dict[str, Any]], ...] = (
+    ("correlation_alert_threshold", _validate_corr_threshold, {}),
+    ("momentum_significance_threshold", _validate_ratio_setting, {"min_value": 0.0, "max_value": 0.99}),
+    ("momentum_significance_lookback", _validate_positive_int_setting, {"minimum": 120, "maximum": 2000}),
+    ("trend_consistency_adx", _validate_float_range_setting, {"minimum": 0.0, "maximum": 100.0}),
+    ("trend_consistency_chop", _validate_float_range_setting, {"minimum": 0.0, "maximum": 100.0}),
+    ("trend_consistency_fast_span", _validate_positive_int_setting, {"minimum": 2, "maximum": 250}),
+    ("trend_consistency_slow_span", _validate_positive_int_setting, {"minimum": 5, "maximum": 500}),
+    ("stability_window", _validate_positive_int_setting, {"minimum": 2, "maximum": 250}),
+    ("stability_top_n", _validate_positive_int_setting, {"minimum": 1, "maximum": 100}),
+    ("stability_weight", _validate_ratio_setting, {"min_value": 0.0, "max_value": 1.0}),
 )
-if _CORRELATION_ALERT_THRESHOLD != _SETTINGS.get("correlation_alert_threshold"):
-    _SETTINGS["correlation_alert_threshold"] = _CORRELATION_ALERT_THRESHOLD
-    _settings_dirty = True
-
-_MOMENTUM_SIGNIFICANCE_THRESHOLD = _validate_ratio_setting(
-    _SETTINGS.get("momentum_significance_threshold"),
-    _DEFAULT_SETTINGS["momentum_significance_threshold"],
-    min_value=0.0,
-    max_value=0.99,
-)
-if _MOMENTUM_SIGNIFICANCE_THRESHOLD != _SETTINGS.get("momentum_significance_threshold"):
-    _SETTINGS["momentum_significance_threshold"] = _MOMENTUM_SIGNIFICANCE_THRESHOLD
-    _settings_dirty = True
-
-_MOMENTUM_SIGNIFICANCE_LOOKBACK = _validate_positive_int_setting(
-    _SETTINGS.get("momentum_significance_lookback"),
-    _DEFAULT_SETTINGS["momentum_significance_lookback"],
-    minimum=120,
-    maximum=2000,
-)
-if _MOMENTUM_SIGNIFICANCE_LOOKBACK != _SETTINGS.get("momentum_significance_lookback"):
-    _SETTINGS["momentum_significance_lookback"] = _MOMENTUM_SIGNIFICANCE_LOOKBACK
-    _settings_dirty = True
-
-_TREND_CONSISTENCY_ADX = _validate_float_range_setting(
-    _SETTINGS.get("trend_consistency_adx"),
-    _DEFAULT_SETTINGS["trend_consistency_adx"],
-    minimum=0.0,
-    maximum=100.0,
-)
-if _TREND_CONSISTENCY_ADX != _SETTINGS.get("trend_consistency_adx"):
-    _SETTINGS["trend_consistency_adx"] = _TREND_CONSISTENCY_ADX
-    _settings_dirty = True
 
-_TREND_CONSISTENCY_CHOP = _validate_float_range_setting(
-    _SETTINGS.get("trend_consistency_chop"),
-    _DEFAULT_SETTINGS["trend_consistency_chop"],
-    minimum=0.0,
-    maximum=100.0,
-)
-if _TREND_CONSISTENCY_CHOP != _SETTINGS.get("trend_consistency_chop"):
-    _SETTINGS["trend_consistency_chop"] = _TREND_CONSISTENCY_CHOP
-    _settings_dirty = True
-
-_TREND_FAST_SPAN = _validate_positive_int_setting(
-    _SETTINGS.get("trend_consistency_fast_span"),
-    _DEFAULT_SETTINGS["trend_consistency_fast_span"],
-    minimum=2,
-    maximum=250,
-)
-if _TREND_FAST_SPAN != _SETTINGS.get("trend_consistency_fast_span"):
-    _SETTINGS["trend_consistency_fast_span"] = _TREND_FAST_SPAN
-    _settings_dirty = True
-
-_TREND_SLOW_SPAN = _validate_positive_int_setting(
-    _SETTINGS.get("trend_consistency_slow_span"),
-    _DEFAULT_SETTINGS["trend_consistency_slow_span"],
-    minimum=5,
-    maximum=500,
-)
-if _TREND_SLOW_SPAN != _SETTINGS.get("trend_consistency_slow_span"):
-    _SETTINGS["trend_consistency_slow_span"] = _TREND_SLOW_SPAN
-    _settings_dirty = True
+# 模块级常量取校验函数的返回值（类型已规范化），不直接读 _SETTINGS 里的原值
+_VALIDATED_SETTINGS: Dict[str, Any] = {}
+for _key, _validator, _kwargs in _SETTINGS_SCHEMA:
+    _current = _SETTINGS.get(_key)
+    _validated = _validator(_current, _DEFAULT_SETTINGS[_key], **_kwargs)
+    _VALIDATED_SETTINGS[_key] = _validated
+    if _validated != _current:
+        _SETTINGS[_key] = _validated
+        _settings_dirty = True
+del _key, _validator, _kwargs, _current, _validated
+
+_CORRELATION_ALERT_THRESHOLD = _VALIDATED_SETTINGS["correlation_alert_threshold"]
+_MOMENTUM_SIGNIFICANCE_THRESHOLD = _VALIDATED_SETTINGS["momentum_significance_threshold"]
+_MOMENTUM_SIGNIFICANCE_LOOKBACK = _VALIDATED_SETTINGS["momentum_significance_lookback"]
+_TREND_CONSISTENCY_ADX = _VALIDATED_SETTINGS["trend_consistency_adx"]
+_TREND_CONSISTENCY_CHOP = _VALIDATED_SETTINGS["trend_consistency_chop"]
+_TREND_FAST_SPAN = _VALIDATED_SETTINGS["trend_consistency_fast_span"]
+_TREND_SLOW_SPAN = _VALIDATED_SETTINGS["trend_consistency_slow_span"]
+_STABILITY_WINDOW = _VALIDATED_SETTINGS["stability_window"]
+_STABILITY_TOP_N = _VALIDATED_SETTINGS["stability_top_n"]
+_STABILITY_WEIGHT = _VALIDATED_SETTINGS["stability_weight"]
 
 if _TREND_SLOW_SPAN <= _TREND_FAST_SPAN:
     _TREND_SLOW_SPAN = min(500, _TREND_FAST_SPAN + 5)
@@ -254,36 +225,6 @@ if _STABILITY_METHOD not in {"presence_ratio", "kendall"}:
     _SETTINGS["stability_method"] = _STABILITY_METHOD
     _settings_dirty = True
 
-_STABILITY_WINDOW = _validate_positive_int_setting(
-    _SETTINGS.get("stability_window"),
-    _DEFAULT_SETTINGS["stability_window"],
-    minimum=2,
-    maximum=250,
-)
-if _STABILITY_WINDOW != _SETTINGS.get("stability_window"):
-    _SETTINGS["stability_window"] = _STABILITY_WINDOW
-    _settings_dirty = True
-
-_STABILITY_TOP_N = _validate_positive_int_setting(
-    _SETTINGS.get("stability_top_n"),
-    _DEFAULT_SETTINGS["stability_top_n"],
-    minimum=1,
-    maximum=100,
-)
-if _STABILITY_TOP_N != _SETTINGS.get("stability_top_n"):
-    _SETTINGS["stability_top_n"] = _STABILITY_TOP_N
-    _settings_dirty = True
-
-_STABILITY_WEIGHT = _validate_ratio_setting(
-    _SETTINGS.get("stability_weight"),
-    _DEFAULT_SETTINGS["stability_weight"],
-    min_value=0.0,
-    max_value=1.0,
-)
-if _STABILITY_WEIGHT != _SETTINGS.get("stability_weight"):
-    _SETTINGS["stability_weight"] = _STABILITY_WEIGHT
-    _settings_dirty = True
-
 if _settings_dirty:
     _save_cli_settings(_SETTINGS)
 
@@ -627,50 +568,17 @@ def _rank_style(rank: int) -> str | None:
     return None
 
 
-def _detect_rank_drop_alerts(result, weeks: int = _MOMENTUM_ALERT_WEEKS, min_drop: int = _MOMENTUM_ALERT_MIN_DROP, top_n: int = _MOMENTUM_ALERT_TOP) -> List[dict]:
-    summary = result.summary
-    rank_history = result.rank_history
-    if summary.empty or rank_history.empty:
-        return []
-    summary_sorted = summary.sort_values("momentum_rank")
-    codes = [str(code) for code in summary_sorted["etf"].head(top_n) if isinstance(code, str)]
-    if not codes:
-        return []
-    weekly = rank_history.sort_index().resample("W-FRI").last().ffill()
-    alerts: List[dict] = []
-    for code in codes:
-        if code not in weekly.columns:
-            continue
-        series = weekly[code].dropna()
-        if len(series) < weeks + 1:
-            continue
-        recent_diff = series.diff().iloc[-weeks:]
-        if recent_diff.isna().any():
-            continue
-        if not (recent_diff > 0).all():
-            continue
-        start_rank = float(series.iloc[-(weeks + 1)])
-        end_rank = float(series.iloc[-1])
-        total_drop = end_rank - start_rank
-        if total_drop < min_drop:
-            continue
-        alerts.append(
-            {
-                "code": code,
-                "label": _format_label(code),
-                "start_rank": int(round(start_rank)),
-                "end_rank": int(round(end_rank)),
-                "weeks": weeks,
-                "drop": round(total_drop, 2),
-            }
-        )
-    return alerts
-
-
 # Moved to business.alerts
 from .business import detect_high_correlation_pairs as _business_detect_high_correlation_pairs
+from .business import detect_rank_drop_alerts as _business_detect_rank_drop_alerts
 from .business import collect_alerts as _business_collect_alerts
 
+def _detect_rank_drop_alerts(result, weeks: int = _MOMENTUM_ALERT_WEEKS, min_drop: int = _MOMENTUM_ALERT_MIN_DROP, top_n: int = _MOMENTUM_ALERT_TOP) -> List[dict]:
+    return _business_detect_rank_drop_alerts(
+        result, weeks=weeks, min_drop=min_drop, top_n=top_n, format_label_func=_format_label
+    )
+
+
 def _detect_high_correlation_pairs(
     corr: pd.DataFrame,
     threshold: float | None = None,
@@ -872,10 +780,35 @@ _MAX_ESC_SEQUENCE = 16
 from .ui.input import read_keypress as _read_keypress
 
 
+def _hook_terminal_resize() -> None:
+    """终端尺寸变化（SIGWINCH）时让列宽缓存失效；只尝试一次
+
+    Windows 没有 SIGWINCH，非主线程也无法注册信号，这两种情况继续按 ttl 轮询。
+    """
+    _TERMINAL_SIZE_CACHE["resize_hooked"] = True
+    sigwinch = getattr(signal, "SIGWINCH", None)
+    if sigwinch is None:
+        return
+    try:
+        previous = signal.getsignal(sigwinch)
+
+        def _on_resize(signum, frame) -> None:
+            _TERMINAL_SIZE_CACHE["timestamp"] = float("-inf")
+            if callable(previous):
+                previous(signum, frame)
+
+        signal.signal(sigwinch, _on_resize)
+    except (ValueError, OSError):
+        return
+    _TERMINAL_SIZE_CACHE["ttl"] = 5.0
+
+
 def _get_terminal_columns() -> int:
+    if not _TERMINAL_SIZE_CACHE["resize_hooked"]:
+        _hook_terminal_resize()
     now = time.monotonic()
     cached = _TERMINAL_SIZE_CACHE["columns"]
-    if cached and now - _TERMINAL_SIZE_CACHE["timestamp"] <= 1.0:
+    if cached and now - _TERMINAL_SIZE_CACHE["timestamp"] <= _TERMINAL_SIZE_CACHE["ttl"]:
         return cached
     try:
         columns = shutil.get_terminal_size(fallback=(120, 30)).columns
@@ -963,10 +896,11 @@ def _delete_template_entry(name: str) -> bool:
 
 # Moved to business.templates
 from .business import print_template_list as _business_print_template_list
+from .business import load_template_store_readonly as _business_load_template_store_readonly
 
 def _print_template_list() -> None:
-    store = _load_template_store()
-    _business_print_template_list(store)
+    # 只读打印，无需复制整个模板存储
+    _business_print_template_list(_business_load_template_store_readonly())
 
 
 # Moved to business.templates
@@ -2554,9 +2488,9 @@ def _install_optional_dependencies() -> None:
 
 
 # Moved to business.config (57 lines)
-from .business import configure_cli_theme_interactive as _biz_config_cli_theme
-
 def _configure_cli_theme() -> None:
+    from .business.config import configure_cli_theme_interactive as _biz_config_cli_theme
+
     _biz_config_cli_theme(
         current_theme=_STYLE_THEME,
         theme_order=_CLI_THEME_ORDER,
@@ -2570,8 +2504,6 @@ def _configure_cli_theme() -> None:
 
 
 # Moved to business.config (72 lines)
-from .business import configure_plot_style_interactive as _biz_config_plot_style
-
 def _configure_plot_style() -> None:
     global _PLOT_TEMPLATE, _PLOT_LINE_WIDTH
 
@@ -2585,6 +2517,8 @@ def _configure_plot_style() -> None:
         _PLOT_LINE_WIDTH = width
         _update_setting(_SETTINGS, "plot_line_width", _PLOT_LINE_WIDTH)
 
+    from .business.config import configure_plot_style_interactive as _biz_config_plot_style
+
     _biz_config_plot_style(
         current_template=_PLOT_TEMPLATE,
         current_line_width=_PLOT_LINE_WIDTH,
@@ -2599,9 +2533,9 @@ def _configure_plot_style() -> None:
 
 
 # Moved to business.config (44 lines)
-from .business import configure_correlation_threshold_interactive as _biz_config_corr_threshold
-
 def _configure_correlation_threshold() -> None:
+    from .business.config import configure_correlation_threshold_interactive as _biz_config_corr_threshold
+
     _biz_config_corr_threshold(
         current_threshold=_CORRELATION_ALERT_THRESHOLD,
         validate_func=_validate_corr_threshold,
@@ -2613,9 +2547,9 @@ def _configure_correlation_threshold() -> None:
 
 
 # Moved to business.config (63 lines)
-from .business import configure_signal_thresholds_interactive as _biz_config_signal_thresholds
-
 def _configure_signal_thresholds() -> None:
+    from .business.config import configure_signal_thresholds_interactive as _biz_config_signal_thresholds
+
     _biz_config_signal_thresholds(
         momentum_lookback=_MOMENTUM_SIGNIFICANCE_LOOKBACK,
         momentum_threshold=_MOMENTUM_SIGNIFICANCE_THRESHOLD,
@@ -2635,9 +2569,9 @@ def _configure_signal_thresholds() -> None:
 
 
 # Moved to business.config (103 lines)
-from .business import configure_stability_settings_interactive as _biz_config_stability
-
 def _configure_stability_settings() -> None:
+    from .business.config import configure_stability_settings_interactive as _biz_config_stability
+
     _biz_config_stability(
         current_method=_STABILITY_METHOD,
         current_window=_STABILITY_WINDOW,
@@ -3610,8 +3544,6 @@ def _obtain_backtest_context(
 
 
 # Moved to business.backtest (63 lines)
-from .business.backtest import run_simple_backtest as _biz_run_simple_backtest
-
 def _run_simple_backtest(
     result,
     preset: AnalysisPreset,
@@ -3620,6 +3552,9 @@ def _run_simple_backtest(
     frequency: str = "monthly",
     observation_period: int = 0,
 ) -> None:
+    # 回测模块依赖 numba，按需导入，避免拖慢 CLI 启动
+    from .business.backtest import run_simple_backtest as _biz_run_simple_backtest
+
     _biz_run_simple_backtest(
         result,
         preset,
@@ -3628,8 +3563,6 @@ def _run_simple_backtest(
         observation_period=observation_period,
     )
 
-from .business.experimental import run_experimental_momentum_backtest as _biz_run_experimental_momentum
-
 def _run_experimental_scientific_momentum(last_state: Optional[dict] = None) -> None:
     """实验性功能菜单：科学动量回测 + 参数优化"""
     while True:
@@ -3729,6 +3662,8 @@ def _run_scientific_momentum_single(last_state: Optional[dict] = None) -> None:
             cfg = EXPERIMENTAL_PRESETS[preset_keys[0]]  # fallback to first
             print(colorize(f"[实验] 解析错误，使用默认预设: {preset_keys[0]}", "warning"))
 
+    from .business.experimental import run_experimental_momentum_backtest as _biz_run_experimental_momentum
+
     return _biz_run_experimental_momentum(
         obtain_context_func=_obtain_backtest_context,
         format_label_func=_format_label,
@@ -3902,12 +3837,7 @@ def _show_optimization_results() -> None:
     _wait_for_ack()
 
 
-#   business.backtest
-from .business.backtest import core_satellite_portfolio_returns as _core_satellite_portfolio_returns
-
-
-# moved to business.backtest
-from .business.backtest import calculate_performance_metrics as _calculate_performance_metrics
+# core_satellite_portfolio_returns / calculate_performance_metrics moved to business.backtest
 
 
 def _render_backtest_table(rows: List[dict]) -> str:
@@ -3930,8 +3860,6 @@ def _render_backtest_table(rows: List[dict]) -> str:
 
 
 # Moved to business.backtest (approx 120 lines)
-from .business.backtest import run_core_satellite_multi_backtest as _biz_run_core_satellite
-from .business.backtest import run_core_satellite_custom_backtest as _biz_run_core_satellite_custom
 
 
 def _run_core_satellite_custom_backtest(last_state: Optional[dict] = None) -> None:
@@ -3977,6 +3905,8 @@ def _run_core_satellite_custom_backtest(last_state: Optional[dict] = None) -> No
         top_n_trend = 0
         top_n_def = 0
 
+    from .business.backtest import run_core_satellite_custom_backtest as _biz_run_core_satellite_custom
+
     return _biz_run_core_satellite_custom(
         obtain_context_func=_obtain_backtest_context,
         get_core_satellite_codes_func=_get_core_satellite_codes,
@@ -3997,11 +3927,17 @@ def _run_core_satellite_custom_backtest(last_state: Optional[dict] = None) -> No
 
 
 def _run_core_satellite_multi_backtest(last_state: Optional[dict] = None) -> None:
-    return _biz_run_core_satellite(
+    from .business.backtest import (
+        calculate_performance_metrics,
+        core_satellite_portfolio_returns,
+        run_core_satellite_multi_backtest,
+    )
+
+    return run_core_satellite_multi_backtest(
         obtain_context_func=_obtain_backtest_context,
         get_core_satellite_codes_func=_get_core_satellite_codes,
-        core_satellite_returns_func=_core_satellite_portfolio_returns,
-        calc_metrics_func=_calculate_performance_metrics,
+        core_satellite_returns_func=core_satellite_portfolio_returns,
+        calc_metrics_func=calculate_performance_metrics,
         format_label_func=_format_label,
         colorize_func=colorize,
         render_table_func=_render_backtest_table,
@@ -44,11 +44,10 @@ def load_cli_settings() -> dict[str, Any]:
         >>> isinstance(settings, dict)
         True
     """
-    if not SETTINGS_STORE_PATH.exists():
-        return {}
+    # 文件不存在时 read_bytes 抛 OSError，无需先 exists() 再多一次 stat
     try:
-        raw = json.loads(SETTINGS_STORE_PATH.read_text(encoding="utf-8"))
-    except (OSError, json.JSONDecodeError):
+        raw = json.loads(SETTINGS_STORE_PATH.read_bytes())
+    except (OSError, UnicodeDecodeError, json.JSONDecodeError):
         return {}
     if isinstance(raw, dict):
         return raw
@@ -19,6 +19,7 @@ from .menu import (
     render_menu_block,
     erase_menu_block,
     print_menu_static,
+    MenuOption,
     MenuState,
 )
 from .interactive import (
@@ -41,6 +42,7 @@ __all__ = [
     "render_menu_block",
     "erase_menu_block",
     "print_menu_static",
+    "MenuOption",
     "MenuState",
     # Interactive utilities
     "prompt_menu_choice",
@@ -11,14 +11,14 @@ from typing import Any, Dict, List, Optional, Sequence
 
 from ..utils.colors import colorize
 from .input import read_keypress, clear_screen
-from .menu import MenuState, supports_interactive_menu, print_menu_static
+from .menu import MenuOption, MenuState, supports_interactive_menu, print_menu_static
 
 # 环境变量控制：是否保留输出（不擦除之前的菜单）
 _PRESERVE_OUTPUT = os.environ.get("MOMENTUM_CLI_PRESERVE_OUTPUT", "").lower() in {"1", "true", "yes"}
 
 
 def prompt_menu_choice(
-    options: Sequence[Dict[str, Any]],
+    options: Sequence[Dict[str, Any] | MenuOption],
     *,
     title: Optional[str] = None,
     header_lines: Sequence[str] | None = None,
@@ -34,7 +34,7 @@ def prompt_menu_choice(
     """提示用户从菜单中选择
     
     Args:
-        options: 选项列表，每项包含 'key', 'label', 'enabled' 等字段
+        options: 选项列表，每项为 MenuOption 或包含 'key', 'label', 'enabled' 等字段的字典
         title: 菜单标题
         header_lines: 头部额外行
         hint: 提示文本
@@ -49,18 +49,8 @@ def prompt_menu_choice(
     Returns:
         用户选择的键，或特殊值如 "__escape__"
     """
-    # 标准化选项
-    normalized = []
-    for option in options:
-        key = str(option.get("key", ""))
-        display = str(option.get("display", key))
-        normalized.append({
-            "index": display,
-            "key": key,
-            "label": option.get("label", ""),
-            "enabled": bool(option.get("enabled", True)),
-            "extra_lines": option.get("extra_lines", []),
-        })
+    # 标准化选项：字典统一转为 MenuOption，后续只按属性读取
+    normalized = [_as_menu_option(option) for option in options]
     
     if clear_screen_first:
         clear_screen()
@@ -79,8 +69,22 @@ def prompt_menu_choice(
     )
 
 
+def _as_menu_option(option: Dict[str, Any] | MenuOption) -> MenuOption:
+    """把字典形式的菜单项转换为 MenuOption，已是 MenuOption 的原样返回"""
+    if isinstance(option, MenuOption):
+        return option
+    key = str(option.get("key", ""))
+    return MenuOption(
+        key=key,
+        label=option.get("label", ""),
+        display=str(option.get("display", key)),
+        extra_lines=tuple(option.get("extra_lines", ())),
+        enabled=bool(option.get("enabled", True)),
+    )
+
+
 def _handle_non_interactive_menu(
-    options: List[Dict[str, Any]],
+    options: List[MenuOption],
     title: Optional[str],
     header_lines: Sequence[str] | None,
     hint: Optional[str],
@@ -115,7 +119,7 @@ def _handle_non_interactive_menu(
 
 
 def _handle_interactive_menu(
-    options: List[Dict[str, Any]],
+    options: List[MenuOption],
     title: Optional[str],
     header_lines: Sequence[str] | None,
     hint: Optional[str],
@@ -256,14 +260,14 @@ def _process_menu_key(
             target_idx = menu_state.find_item_by_key(pending)
             if target_idx is not None:
                 item = menu_state.items[target_idx]
-                if item.get("enabled", True):
-                    return item.get("key", "")
+                if item.enabled:
+                    return item.key
             return {"pending": ""}
         else:
             # 选择当前项目
             selected = menu_state.get_selected_item()
-            if selected and selected.get("enabled", True):
-                return selected.get("key", "")
+            if selected and selected.enabled:
+                return selected.key
             return None
     
     # ESC键
@@ -281,11 +285,11 @@ def _process_menu_key(
         
         if exact_match is not None:
             item = menu_state.items[exact_match]
-            if item.get("enabled", True):
+            if item.enabled:
                 menu_state.selected_index = exact_match
                 if instant_numeric:
                     # 立即返回
-                    return item.get("key", "")
+                    return item.key
         
         return {"pending": new_pending}
     
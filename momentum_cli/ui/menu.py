@@ -11,11 +11,26 @@ import os
 _PRESERVE_OUTPUT = os.environ.get("MOMENTUM_CLI_PRESERVE_OUTPUT", "").lower() in {"1", "true", "yes"}
 
 import sys
-from typing import Any, Dict, List, Optional, Sequence
+from typing import List, NamedTuple, Optional, Sequence, Tuple
 
 from ..utils.colors import colorize
 
 
+class MenuOption(NamedTuple):
+    """菜单选项（只读，按位置存储字段，可替代 {"key": ..., "label": ...} 字典）"""
+
+    key: str
+    label: str
+    display: str = ""
+    extra_lines: Tuple[str, ...] = ()
+    enabled: bool = True
+
+    @property
+    def display_key(self) -> str:
+        """菜单中显示的编号，未单独指定时与 key 相同"""
+        return self.display or self.key
+
+
 def format_menu_item(
     index: int | str,
     label: str,
@@ -82,7 +97,7 @@ def supports_interactive_menu() -> bool:
 
 
 def render_menu_block(
-    items: List[Dict[str, Any]],
+    items: Sequence[MenuOption],
     selected_index: int = -1,
     title: Optional[str] = None,
     show_hints: bool = True,
@@ -90,7 +105,7 @@ def render_menu_block(
     """渲染菜单块
 
     Args:
-        items: 菜单项列表，每项包含 'index', 'label', 'enabled' 等字段
+        items: 菜单项列表（MenuOption）
         selected_index: 选中的项目索引
         title: 可选的标题
         show_hints: 是否显示操作提示
@@ -110,12 +125,9 @@ def render_menu_block(
         lines.append(colorize("┌─ 功能清单 ─────────────────────────", "border"))
 
     for i, item in enumerate(items):
-        index = item.get("index", i + 1)
-        label = item.get("label", "")
-        enabled = item.get("enabled", True)
         selected = (i == selected_index)
 
-        formatted_item = format_menu_item(index, label, enabled, selected=selected)
+        formatted_item = format_menu_item(item.display_key, item.label, item.enabled, selected=selected)
         lines.append(formatted_item)
 
     if show_hints:
@@ -143,14 +155,14 @@ def erase_menu_block(lines: int) -> None:
 
 
 def print_menu_static(
-    items: List[Dict[str, Any]],
+    items: Sequence[MenuOption],
     title: Optional[str] = None,
     show_hints: bool = True,
 ) -> None:
     """打印静态菜单（非交互模式）
 
     Args:
-        items: 菜单项列表
+        items: 菜单项列表（MenuOption）
         title: 可选的标题
         show_hints: 是否显示操作提示
     """
@@ -162,13 +174,13 @@ def print_menu_static(
 class MenuState:
     """菜单状态管理类"""
 
-    def __init__(self, items: List[Dict[str, Any]]):
+    def __init__(self, items: Sequence[MenuOption]):
         self.items = items
         self.selected_index = 0
         self.rendered_lines = 0
 
         # 找到第一个启用的项目
-        enabled_indices = [i for i, item in enumerate(items) if item.get("enabled", True)]
+        enabled_indices = [i for i, item in enumerate(items) if item.enabled]
         if enabled_indices:
             self.selected_index = enabled_indices[0]
 
@@ -178,7 +190,7 @@ class MenuState:
         Args:
             delta: 移动方向，正数向下，负数向上
         """
-        enabled_indices = [i for i, item in enumerate(self.items) if item.get("enabled", True)]
+        enabled_indices = [i for i, item in enumerate(self.items) if item.enabled]
         if not enabled_indices:
             return
 
@@ -191,7 +203,7 @@ class MenuState:
         new_pos = (current_pos + delta) % len(enabled_indices)
         self.selected_index = enabled_indices[new_pos]
 
-    def get_selected_item(self) -> Optional[Dict[str, Any]]:
+    def get_selected_item(self) -> Optional[MenuOption]:
         """获取当前选中的项目"""
         if 0 <= self.selected_index < len(self.items):
             return self.items[self.selected_index]
@@ -207,7 +219,7 @@ class MenuState:
             项目索引，如果未找到返回None
         """
         for i, item in enumerate(self.items):
-            if str(item.get("index", i + 1)) == key:
+            if item.display_key == key:
                 return i
         return None
 
@@ -5,6 +5,7 @@
 """
 from __future__ import annotations
 
+from functools import lru_cache
 from typing import Optional, Dict, Any
 
 from .colors import colorize, get_rank_style
@@ -51,56 +52,75 @@ def style_rank_header(rank: int, text: str, *, enable_color: bool = True) -> str
     return text
 
 
+# 同一张表里的数值文本高度重复（如 "+1.20%"），解析结果可直接复用
+_cached_extract_float = lru_cache(maxsize=4096)(extract_float)
+
+
+def _sign_style(value: str, row: Dict[str, Any]) -> Optional[str]:
+    number = _cached_extract_float(value)
+    if number is None:
+        return None
+    if number > 0:
+        return "value_positive"
+    if number < 0:
+        return "value_negative"
+    return "value_neutral"
+
+
+def _rank_change_style(value: str, row: Dict[str, Any]) -> Optional[str]:
+    # 排名数字变小代表走强，颜色与数值符号相反
+    number = _cached_extract_float(value)
+    if number is None:
+        return None
+    if number < 0:
+        return "value_positive"
+    if number > 0:
+        return "value_negative"
+    return "value_neutral"
+
+
+def _ma_position_style(value: str, row: Dict[str, Any]) -> Optional[str]:
+    if value.endswith(("上", "UP")):
+        return "value_positive"
+    if value.endswith(("下", "DN")):
+        return "value_negative"
+    return "value_neutral"
+
+
+def _trend_ok_style(value: str, row: Dict[str, Any]) -> Optional[str]:
+    flag = row.get("__trend_ok") if isinstance(row, dict) else None
+    if flag is True:
+        return "value_positive"
+    if flag is False:
+        return "value_negative"
+    return "value_neutral"
+
+
+# 列标签 → 着色规则，每个单元格只需一次字典查找
+_SUMMARY_STYLE_HANDLERS = {
+    "动量": _sign_style,
+    "Momentum": _sign_style,
+    "趋势": _sign_style,
+    "Trend": _sign_style,
+    "变动": _rank_change_style,
+    "ΔRank": _rank_change_style,
+    "200MA": _ma_position_style,
+    "MA200": _ma_position_style,
+    "趋势一致": _trend_ok_style,
+    "TrendOK": _trend_ok_style,
+}
+
+
 def style_summary_value(label: str, value: str, row: Dict[str, Any], *, enable_color: bool = True) -> str:
     if not enable_color:
         return value
-    style: str | None = None
-    if label in {"动量", "Momentum"}:
-        number = extract_float(value)
-        if number is not None:
-            if number > 0:
-                style = "value_positive"
-            elif number < 0:
-                style = "value_negative"
-            else:
-                style = "value_neutral"
-    elif label in {"变动", "ΔRank"}:
-        number = extract_float(value)
-        if number is not None:
-            if number < 0:
-                style = "value_positive"
-            elif number > 0:
-                style = "value_negative"
-            else:
-                style = "value_neutral"
-    elif label in {"趋势", "Trend"}:
-        number = extract_float(value)
-        if number is not None:
-            if number > 0:
-                style = "value_positive"
-            elif number < 0:
-                style = "value_negative"
-            else:
-                style = "value_neutral"
-    elif label in {"200MA", "MA200"}:
-        if value.endswith("上") or value.endswith("UP"):
-            style = "value_positive"
-        elif value.endswith("下") or value.endswith("DN"):
-            style = "value_negative"
-        else:
-            style = "value_neutral"
-    elif label in {"趋势一致", "TrendOK"}:
-        flag = row.get("__trend_ok") if isinstance(row, dict) else None
-        if flag is True:
-            style = "value_positive"
-        elif flag is False:
-            style = "value_negative"
-        else:
-            style = "value_neutral"
+    handler = _SUMMARY_STYLE_HANDLERS.get(label)
+    style = handler(value, row) if handler is not None else None
     if style:
         return colorize(value, style)
     return value
 
+
 from .display import display_width as _display_width, pad_display as _pad_display
 
 